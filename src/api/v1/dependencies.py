@@ -0,0 +1,26 @@
+from typing import Optional
+
+from arq.connections import ArqRedis
+from fastapi import HTTPException, Request
+
+from src.services.gbp_analyzer import GBPAnalyzer
+
+
+def get_analyzer(request: Request) -> GBPAnalyzer:
+    """
+    Returns the shared GBPAnalyzer created during application startup.
+    """
+    analyzer = getattr(request.app.state, "analyzer", None)
+
+    if analyzer is None:
+        error = getattr(request.app.state, "analyzer_error", "analyzer unavailable")
+        raise HTTPException(status_code=503, detail=f"Service Unavailable: {error}")
+
+    return analyzer
+
+
+def get_job_queue(request: Request) -> Optional[ArqRedis]:
+    """
+    Returns the arq job queue, or None when REDIS_URL is not configured.
+    """
+    return getattr(request.app.state, "job_queue", None)
@@ -1,61 +1,287 @@
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import AsyncIterator, Dict, Optional, Set
+
+import orjson
+from arq.connections import ArqRedis
+from arq.jobs import Job
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from src.services.gbp_analyzer import GBPAnalyzer
-from src.core.config import config
+from src.services.cache import cache_get, make_cache_key, normalize_query
+from src.services.errors import ServiceError
+from src.services.llm_detailed_analysis import LLMStreamError, stream_llm_analysis
+from src.api.v1.dependencies import get_analyzer, get_job_queue
 from src.api.v1.schemas.analyzer_schemas import AnalysisResponse, AnalysisRequest
+from src.worker import WorkerSettings
 
 router = APIRouter()
 
+# Analyses started by this process that haven't finished yet, keyed by their
+# cache key. Each future resolves to the job_id, so identical requests that
+# arrive while an analysis is running join that job instead of starting
+# another one.
+_inflight: Dict[str, asyncio.Future] = {}
+_release_tasks: Set[asyncio.Task] = set()
+
+
+def _release(cache_key: str, inflight: asyncio.Future) -> None:
+    if _inflight.get(cache_key) is inflight:
+        del _inflight[cache_key]
+
+
+async def _run_and_release(
+    analyzer: GBPAnalyzer, inflight: asyncio.Future, **analysis_kwargs
+) -> None:
+    try:
+        await analyzer.run_background_analysis(**analysis_kwargs)
+    finally:
+        _release(analysis_kwargs["cache_key"], inflight)
+
+
+async def _release_when_done(
+    job: Job, cache_key: str, inflight: asyncio.Future
+) -> None:
+    try:
+        await job.result(timeout=WorkerSettings.job_timeout, poll_delay=2)
+    except Exception as e:
+        logging.warning("Queued analysis job %s did not complete: %s", job.job_id, e)
+    finally:
+        _release(cache_key, inflight)
+
+
+def _error_status_code(result: dict) -> int:
+    error_code = result.get("error_code")
+    if error_code == ServiceError.NOT_FOUND:
+        return 404
+    if error_code == ServiceError.INVALID_INPUT:
+        return 400
+    return 500
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {orjson.dumps(payload).decode('utf-8')}\n\n"
+
+
+def _analysis_cache_key(request: AnalysisRequest) -> str:
+    return make_cache_key(
+        "analyze",
+        request.place_id or normalize_query(request.business_name),
+        request.model_choice.value,
+        request.address,
+        request.star_rating,
+        request.review_count,
+        request.phone_number,
+        request.include_detailed_analysis,
+    )
+
+
+async def _run_inline_analysis(
+    analyzer: GBPAnalyzer, request: AnalysisRequest, include_llm_analysis: bool
+) -> dict:
+    result = await analyzer.analyze(
+        query=request.business_name,
+        place_id=request.place_id,
+        user_provided_address=request.address,
+        user_provided_rating=request.star_rating,
+        user_provided_reviews=request.review_count,
+        user_provided_phone=request.phone_number,
+        include_llm_analysis=include_llm_analysis,
+    )
+
+    if not result:
+        return {
+            "success": False,
+            "error_code": ServiceError.INTERNAL,
+            "error": "Analysis returned no result",
+        }
+
+    return result
+
 
 @router.post(
     "/analyze",
     summary="Analyze a Google Business Profile",
     response_model=AnalysisResponse,
 )
-def analyze_business(request: AnalysisRequest, background_tasks: BackgroundTasks):
+async def analyze_business(
+    request: AnalysisRequest,
+    background_tasks: BackgroundTasks,
+    analyzer: GBPAnalyzer = Depends(get_analyzer),
+    job_queue: Optional[ArqRedis] = Depends(get_job_queue),
+    background: bool = Query(
+        True,
+        description="Run the analysis as a job and return its job_id. "
+        "Set to false to wait for the analysis and get the data back directly.",
+    ),
+):
     """
     Performs a full analysis of a Google Business Profile.
     Provide EITHER a `query` or a `place_id`.
+    By default the analysis runs as a job: on the arq worker when Redis is
+    configured, and as an in-process background task otherwise.
     """
-    try:
-
-        analyzer = GBPAnalyzer(api_key=config.SERP_API_KEY)
-    except ValueError as e:
-        raise HTTPException(status_code=503, detail=f"Service Unavailable: {e}")
-
     logging.info(
-        f"Received API request. Query: '{request.business_name}', Place ID: '{request.place_id}'"  # noqa
+        "Received API request. Query: '%s', Place ID: '%s'",
+        request.business_name,
+        request.place_id,
     )
 
-    job_result = analyzer.create_analysis_job(
-        business_name=request.business_name,
-        place_id=request.place_id,
-        address=request.address,
-        star_rating=request.star_rating,
-        review_count=request.review_count,
-        phone_number=request.phone_number,
-    )
+    if not background:
+        result = await _run_inline_analysis(
+            analyzer, request, include_llm_analysis=request.include_detailed_analysis
+        )
+        if not result.get("success"):
+            raise HTTPException(
+                status_code=_error_status_code(result),
+                detail=result.get("error", "Analysis failed."),
+            )
+
+        return AnalysisResponse(
+            status="Analysis Finished",
+            message="Analysis completed successfully",
+            data=result["data"],
+        )
+
+    cache_key = _analysis_cache_key(request)
+    cached = await cache_get(cache_key)
+    if cached:
+        logging.info("Serving cached analysis job %s", cached["job_id"])
+        return AnalysisResponse(
+            status="Analysis Finished",
+            message="Analysis served from cache",
+            job_id=cached["job_id"],
+        )
 
-    if not job_result.get("success"):
-        error_message = job_result.get("error", "Job creation failed.")
-        raise HTTPException(status_code=500, detail=error_message)
+    inflight = _inflight.get(cache_key)
+    if inflight is not None:
+        job_id = await asyncio.shield(inflight)
+        logging.info("Joining in-flight analysis job %s", job_id)
+        return AnalysisResponse(
+            status="Pending", message="Analysis in progress", job_id=job_id
+        )
+
+    inflight = asyncio.get_running_loop().create_future()
+    # Failures are re-raised to this request; joiners are optional.
+    inflight.add_done_callback(lambda future: future.cancelled() or future.exception())
+    _inflight[cache_key] = inflight
+
+    try:
+        job_result = await analyzer.create_analysis_job(
+            business_name=request.business_name,
+            place_id=request.place_id,
+            address=request.address,
+            star_rating=request.star_rating,
+            review_count=request.review_count,
+            phone_number=request.phone_number,
+        )
+
+        if not job_result.get("success"):
+            raise HTTPException(
+                status_code=_error_status_code(job_result),
+                detail=job_result.get("error", "Job creation failed."),
+            )
+    except BaseException as e:
+        # Also covers this request being cancelled, so joiners waiting on the
+        # future are never left hanging.
+        _release(cache_key, inflight)
+        if isinstance(e, Exception):
+            inflight.set_exception(e)
+        else:
+            inflight.set_exception(
+                HTTPException(status_code=503, detail="Analysis request was cancelled.")
+            )
+        raise
 
     job_id = job_result.get("job_id")
+    inflight.set_result(job_id)
 
-    background_tasks.add_task(
-        analyzer.run_background_analysis,
-        job_id=job_result["job_id"],
+    analysis_kwargs = dict(
+        job_id=job_id,
         business_name=request.business_name,
-        place_id=request.place_id,
+        # Job creation already resolved the place_id; reusing it saves the
+        # analysis a second search.
+        place_id=job_result.get("place_id") or request.place_id,
         address=request.address,
         star_rating=request.star_rating,
         review_count=request.review_count,
         phone_number=request.phone_number,
+        cache_key=cache_key,
+        include_llm_analysis=request.include_detailed_analysis,
     )
 
-    logging.info(f"Started background analysis for job {job_id}")
+    if job_queue is not None:
+        try:
+            job = await job_queue.enqueue_job("run_analysis", **analysis_kwargs)
+        except BaseException:
+            _release(cache_key, inflight)
+            raise
+        release_task = asyncio.create_task(_release_when_done(job, cache_key, inflight))
+        _release_tasks.add(release_task)
+        release_task.add_done_callback(_release_tasks.discard)
+    else:
+        background_tasks.add_task(
+            _run_and_release, analyzer, inflight, **analysis_kwargs
+        )
+
+    logging.info("Started background analysis for job %s", job_id)
 
     return AnalysisResponse(
         status="Pending", message="Analysis in progress", job_id=job_id
     )
+
+
+@router.post(
+    "/analyze/stream",
+    summary="Analyze a Google Business Profile and stream the results",
+    response_class=StreamingResponse,
+)
+async def analyze_business_stream(
+    request: AnalysisRequest,
+    analyzer: GBPAnalyzer = Depends(get_analyzer),
+):
+    """
+    Runs the analysis inline and streams it back as Server-Sent Events.
+
+    Events, each carrying a JSON `data` line:
+    - `data`: the score and collected business data, sent once scoring is done
+    - `token`: the next chunk of the detailed LLM analysis
+    - `error`: the analysis failed; the stream ends after it
+    - `done`: the analysis is complete
+    """
+    logging.info(
+        "Received streaming request. Query: '%s', Place ID: '%s'",
+        request.business_name,
+        request.place_id,
+    )
+
+    async def event_stream() -> AsyncIterator[str]:
+        result = await _run_inline_analysis(
+            analyzer, request, include_llm_analysis=False
+        )
+
+        if not result.get("success"):
+            yield _sse(
+                "error",
+                {
+                    "error_code": result.get("error_code", ServiceError.INTERNAL),
+                    "error": result.get("error", "Analysis failed."),
+                },
+            )
+            return
+
+        business_data = result["data"]
+        business_data.pop("llm_analysis", None)
+        yield _sse("data", {"score": business_data.get("score"), "data": business_data})
+
+        try:
+            async for text in stream_llm_analysis(business_data, request.model_choice):
+                yield _sse("token", {"text": text})
+        except LLMStreamError as e:
+            yield _sse("error", {"error_code": e.error_code, "error": e.message})
+            return
+
+        yield _sse("done", {})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
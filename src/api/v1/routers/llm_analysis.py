@@ -15,17 +15,18 @@ router = APIRouter()
     summary="Generate a detailed LLM analysis from business data",
     response_model=DetailedAnalysisResponse,
 )
-def generate_detailed_analysis(request: DetailedAnalysisRequest):
+async def generate_detailed_analysis(request: DetailedAnalysisRequest):
     """
     Takes the score and data from the primary `/analyze` endpoint and
     generates a detailed, human-readable analysis using a generative AI model.
     """
 
     logging.info(
-        f"Received request for detailed analysis for business: {request.data.get('title')}"  # noqa
+        "Received request for detailed analysis for business: %s",
+        request.data.get("title"),
     )
 
-    analysis_text = get_llm_analysis(
+    analysis_text = await get_llm_analysis(
         business_data=request.data,
         model_choice=request.model_choice,
     )
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from src.services.cache import cache_stats
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    summary="Cache hit/miss counters",
+)
+async def get_metrics():
+    """
+    Returns cache hit and miss counters, grouped by cache namespace.
+    """
+    return {"cache": dict(cache_stats)}
@@ -1,10 +1,61 @@
+import asyncio
 import logging
-from src.core.config import config
-from serpapi import GoogleSearch
+from dataclasses import dataclass, field
+from src.scrapers.browser_pool import close_browser
 from src.scrapers.photo_scraper import PhotoScraper
-from typing import List, Dict
+from src.services.http_client import close_http_client
+from src.services.serp_cache import serp_get
+from src.utils.analyzer_helper import (
+    _first_search_result,
+    _is_recent_review,
+    _kg_socials_cached,
+    _paginate_results,
+    _reached_older_reviews,
+)
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    List,
+    Dict,
+    Optional,
+    TypeVar,
+)
+
+try:
+    import uvloop
+except ImportError:  # uvloop isn't available on Windows
+    uvloop = None
+
+T = TypeVar("T")
+
+
+def _run_event_loop(main: Coroutine[Any, Any, T]) -> T:
+    """
+    Runs `main` to completion on a new event loop. Like the API server, sync
+    callers get uvloop when it is installed (it ships with uvicorn[standard]).
+    """
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(main)
+
+
+async def _no_results() -> list:
+    return []
 
-logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """
+    The outcome of analyzing one query with GmbAnalyzer.
+    """
+
+    query: str
+    success: bool = False
+    error: Optional[str] = None
+    data: dict = field(default_factory=dict)
 
 
 class GmbAnalyzer:
@@ -12,7 +63,7 @@ class GmbAnalyzer:
     A class to encapsulate the logic for fetching and analyzing a Google Business Profile.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str) -> None:
         if not api_key:
             raise ValueError(
                 "SERP_API_KEY is required. Please replace the placeholder value."
@@ -21,9 +72,34 @@ class GmbAnalyzer:
         # Safety limits to prevent excessive API usage
         self.pagination_page_limit = 10
         self.pagination_item_limit = 200
+        self.max_concurrent_analyses = 10
         self.photo_scraper = PhotoScraper()
+        # Shared by every SerpApi request this analyzer makes.
+        self._base_params = {"api_key": api_key}
+        # One paginator per result type, with its results key and stop
+        # condition bound once here instead of passed on every call.
+        self._paginate_posts = self._make_paginator("posts")
+        self._paginate_photos = self._make_paginator("photos")
+        # Only last-month reviews are used, so stop once older ones show up.
+        self._paginate_reviews = self._make_paginator(
+            "reviews", stop_when=_reached_older_reviews
+        )
 
-    def _fetch_posts_by_data_id(self, data_id: str, business_title: str) -> list:
+    def _params(self, engine: str, **fields: Any) -> dict:
+        """
+        Builds the parameters for one SerpApi request. Each call returns a new
+        dict, since pagination advances the page token on it in place.
+        """
+        return {**self._base_params, "engine": engine, **fields}
+
+    async def _search(self, params: dict) -> dict:
+        """
+        Runs a single SerpApi search over the shared HTTP client, served from
+        the SerpApi response cache when possible.
+        """
+        return await serp_get(params)
+
+    async def _fetch_posts_by_data_id(self, data_id: str, business_title: str) -> list:
         """
         Legacy method to fetch posts using the google_maps_posts engine.
         Used as a final fallback.
@@ -33,58 +109,30 @@ class GmbAnalyzer:
 
         logging.info(f"Attempting legacy post fetch using data_id: {data_id}")
 
-        params = {
-            "engine": "google_maps_posts",
-            "q": business_title,
-            "data_id": data_id,
-            "api_key": self.api_key,
-        }
+        params = self._params("google_maps_posts", q=business_title, data_id=data_id)
 
-        return self._paginate_results(params, "posts")
+        return await self._paginate_posts(params)
 
-    def _paginate_results(self, params: dict, results_key: str) -> list:
+    def _make_paginator(
+        self,
+        results_key: str,
+        stop_when: Optional[Callable[[list], bool]] = None,
+    ) -> Callable[[dict], Awaitable[list]]:
         """
-        Generic private helper to paginate through SerpApi results.
+        Returns a coroutine function that paginates SerpApi results for
+        `results_key` using this analyzer's safety limits.
         """
-        all_results = []
-        page_count = 0
 
-        while True:
-            page_count += 1
-            if page_count > self.pagination_page_limit:
-                logging.warning(
-                    f"Reached page limit of {self.pagination_page_limit} for {params.get('engine')}"
-                )
-                break
-
-            search = GoogleSearch(params)
-            results = search.get_dict()
-
-            if "error" in results:
-                logging.error(
-                    f"API Error for {params.get('engine')}: {results['error']}"
-                )
-                break
-
-            page_items = results.get(results_key, [])
-            if not page_items:
-                break
-
-            all_results.extend(page_items)
-            logging.info(
-                f"Fetched page {page_count}: {len(page_items)} {results_key}. Total: {len(all_results)}"
+        async def paginate(params: dict) -> list:
+            return await _paginate_results(
+                params,
+                results_key,
+                page_limit=self.pagination_page_limit,
+                item_limit=self.pagination_item_limit,
+                stop_when=stop_when,
             )
 
-            pagination = results.get("serpapi_pagination", {})
-            if (
-                "next" not in pagination
-                or len(all_results) >= self.pagination_item_limit
-            ):
-                break
-
-            params["next_page_token"] = pagination["next_page_token"]
-
-        return all_results
+        return paginate
 
     def _filter_reviews_by_recency(self, all_reviews: List[Dict]) -> List[Dict]:
         """
@@ -95,68 +143,38 @@ class GmbAnalyzer:
             f"Filtering {len(all_reviews)} reviews to find those from the last month..."
         )
 
-        print("--- DATES RECEIVED FROM API ---")
-        for review in all_reviews:
-            print(
-                f"  -> {review.get('date')}"
-            )  # This will show you everything you received
-        print("-------------------------------")
-
-        recent_reviews = []
-
-        VALID_MONTH_STRINGS = {
-            "now",
-            "today",
-            "a week ago",
-            "2 weeks ago",
-            "3 weeks ago",
-            "4 weeks ago",
-            "a month ago",
-        }
-
-        for review in all_reviews:
-            date_string = review.get("date", "").lower()
-            if not date_string:
-                continue
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                "Review dates received from API: %s",
+                [review.get("date") for review in all_reviews],
+            )
 
-            if date_string in VALID_MONTH_STRINGS or "day" in date_string:
-                recent_reviews.append(review)
+        recent_reviews = [
+            review
+            for review in all_reviews
+            if _is_recent_review(review.get("date", "").lower())
+        ]
 
         logging.info(f"Found {len(recent_reviews)} reviews from the last month.")
         return recent_reviews
 
-    def fetch_all_photos(self, data_id: str) -> list:
+    async def fetch_all_photos(self, data_id: str) -> list:
         if not data_id:
             return []
-        params = {
-            "engine": "google_maps_photos",
-            "data_id": data_id,
-            "api_key": self.api_key,
-        }
-        return self._paginate_results(params, "photos")
+        params = self._params("google_maps_photos", data_id=data_id)
+        return await self._paginate_photos(params)
 
-    def fetch_all_reviews(self, place_id: str) -> list:
+    async def fetch_all_reviews(self, place_id: str) -> list:
         if not place_id:
             return []
-        params = {
-            "engine": "google_maps_reviews",
-            "place_id": place_id,
-            "api_key": self.api_key,
-            "sort_by": "newestFirst",
-        }
-        return self._paginate_results(params, "reviews")
+        params = self._params(
+            "google_maps_reviews", place_id=place_id, sort_by="newestFirst"
+        )
+        return await self._paginate_reviews(params)
 
-    def _fetch_knowledge_graph_socials(self, query: str) -> list:
+    async def _fetch_knowledge_graph_socials(self, query: str) -> list:
         logging.info("Falling back to Google Knowledge Panel for social links...")
-        params = {
-            "engine": "google",
-            "q": query,
-            "api_key": self.api_key,
-        }
-        results = GoogleSearch(params).get_dict()
-        knowledge_graph = results.get("knowledge_graph", {})
-        profiles = knowledge_graph.get("profiles", [])
-        return [{"name": p.get("name"), "link": p.get("link")} for p in profiles]
+        return await _kg_socials_cached(query, self.api_key)
 
     def _get_photo_counts(
         self, business_title: str, photo_attributions: List[Dict]
@@ -166,16 +184,24 @@ class GmbAnalyzer:
         """
         if not photo_attributions:
             return {"owner_photo_count": 0, "customer_photo_count": 0}
-        owner_count, customer_count = 0, 0
-        clean_business_title = business_title.lower().strip()
-        for photo in photo_attributions:
-            uploader_name = photo.get("uploader", "Unknown").lower().strip()
-            # The uploader name in the gallery is often just "By [Business Name]"
-            # This makes the comparison more robust
-            if clean_business_title in uploader_name:
-                owner_count += 1
-            else:
-                customer_count += 1
+        clean_business_title = business_title.casefold().strip()
+        # The uploader name in the gallery is often just "By [Business Name]",
+        # and the scraper labels owner uploads as "Owner"
+        owner_prefixes = (
+            "owner",
+            "by owner",
+            f"by {clean_business_title}",
+            clean_business_title,
+        )
+        owner_count = sum(
+            1
+            for photo in photo_attributions
+            if str(photo.get("uploader") or "Unknown")
+            .casefold()
+            .lstrip()
+            .startswith(owner_prefixes)
+        )
+        customer_count = len(photo_attributions) - owner_count
         logging.info(
             f"Final Tally (from Playwright): Owner: {owner_count}, Customer: {customer_count}"
         )
@@ -184,84 +210,160 @@ class GmbAnalyzer:
             "customer_photo_count": customer_count,
         }
 
-    def analyze(self, query: str) -> dict:
+    def analyze(self, query: str) -> AnalysisResult:
         """
         Main analysis function. Returns structured data without printing.
+        Runs the async analysis on a fresh event loop so sync callers such as
+        the CLI are unaffected.
+        """
+        return _run_event_loop(self._run_with_cleanup(self._analyze_async(query)))
+
+    def analyze_many_sync(self, queries: List[str]) -> List[AnalysisResult]:
+        """
+        Sync wrapper around `analyze_many` for scripts and the CLI.
+        """
+        return _run_event_loop(self._run_with_cleanup(self.analyze_many(queries)))
+
+    async def analyze_many(self, queries: List[str]) -> List[AnalysisResult]:
+        """
+        Analyzes several queries concurrently, at most
+        `max_concurrent_analyses` at a time to stay under SerpApi's rate limit.
+
+        Returns:
+            List[AnalysisResult]: One result per query, in the same order.
         """
+        semaphore = asyncio.Semaphore(self.max_concurrent_analyses)
+
+        async def analyze_one(query: str) -> AnalysisResult:
+            async with semaphore:
+                try:
+                    return await self._analyze_async(query)
+                except Exception as e:
+                    logging.error(f"Analysis failed for query '{query}': {e}")
+                    return AnalysisResult(query=query, error=str(e))
+
+        return await asyncio.gather(*(analyze_one(query) for query in queries))
+
+    async def __aenter__(self) -> "GmbAnalyzer":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """
+        Closes the pooled SerpApi connections and the shared browser. Async
+        callers of `analyze_many` should use the analyzer as an
+        `async with` block so the keep-alive pool is reused across every
+        query in the batch and released once at the end.
+        """
+        await close_http_client()
+        await close_browser()
+
+    async def _run_with_cleanup(self, coro: Awaitable[T]) -> T:
+        # The shared client and browser are bound to this event loop.
+        async with self:
+            return await coro
+
+    async def _analyze_async(self, query: str) -> AnalysisResult:
         logging.info(f"Starting analysis for query: '{query}'")
-        analysis_result = {"query": query, "success": False, "error": None, "data": {}}
+        analysis_result = AnalysisResult(query=query)
 
         # Step 1: Initial search to get IDs
-        search_params = {
-            "engine": "google_maps",
-            "q": query,
-            "type": "search",
-            "api_key": self.api_key,
-        }
-        initial_results = GoogleSearch(search_params).get_dict()
+        search_params = self._params("google_maps", q=query, type="search")
+        initial_results = await self._search(search_params)
 
         if initial_results.get("error"):
-            analysis_result["error"] = initial_results["error"]
+            analysis_result.error = initial_results["error"]
             return analysis_result
 
-        first_result = (
-            initial_results.get("place_results")
-            or (initial_results.get("local_results", [])[0:1] or [None])[0]
-        )
+        first_result = _first_search_result(initial_results)
         if not first_result:
-            analysis_result["error"] = "No GBP found for this query."
+            analysis_result.error = "No GBP found for this query."
             return analysis_result
 
         place_id = first_result.get("place_id")
         data_id = first_result.get("data_id")
         business_title = first_result.get("title")
 
-        # Step 2: Get rich details using place_id for reliability
-        details_params = {
-            "engine": "google_maps",
-            "place_id": place_id,
-            "api_key": self.api_key,
-        }
-        details_results = GoogleSearch(details_params).get_dict()
-        place_data = details_results.get("place_results", {})
+        # Reviews and photo attributions only need the IDs and title from the
+        # search, so they start loading while the details lookup below is
+        # still in flight.
+        reviews_task = asyncio.create_task(self.fetch_all_reviews(place_id))
+        photos_task = asyncio.create_task(
+            self.photo_scraper.get_attributions_by_navigation(place_id, business_title)
+        )
+        # Started tasks keep running on their own, so if this analysis fails
+        # or is cancelled before they all finish, they are cancelled too
+        # rather than left detached (e.g. holding a browser context).
+        started_tasks = [reviews_task, photos_task]
+        try:
+            # Step 2: Get rich details using place_id for reliability, unless the
+            # search was an exact match that already returned them
+            place_data = initial_results.get("place_results")
+            if not place_data:
+                details_params = self._params("google_maps", place_id=place_id)
+                details_results = await self._search(details_params)
+                place_data = details_results.get("place_results", {})
+
+            if not place_data:
+                for task in started_tasks:
+                    task.cancel()
+                analysis_result.error = "Could not fetch detailed place data."
+                return analysis_result
+
+            business_title = place_data.get("title", business_title)
+            logging.info(
+                f"Using official business title for analysis: '{business_title}'"
+            )
 
-        if not place_data:
-            analysis_result["error"] = "Could not fetch detailed place data."
-            return analysis_result
+            all_posts = []
 
-        business_title = place_data.get("title", business_title)
-        logging.info(f"Using official business title for analysis: '{business_title}'")
+            # Tier 1: Check detailed results (modern method)
+            updates_from_details = place_data.get("updates", {})
+            if updates_from_details:
+                all_posts = updates_from_details.get("posts", [])
 
-        all_reviews = self.fetch_all_reviews(place_id)
-        recent_reviews_filtered = self._filter_reviews_by_recency(all_reviews)
+            # Tier 2: Check initial results if Tier 1 fails
+            if not all_posts:
+                logging.warning(
+                    "No posts in detailed results. Checking initial results as fallback."
+                )
+                updates_from_initial = first_result.get("updates", {})
+                if updates_from_initial:
+                    all_posts = updates_from_initial.get("posts", [])
 
-        all_posts = []
+            # Tier 3: Use legacy engine with data_id if Tiers 1 & 2 fail
+            fetch_legacy_posts = not all_posts and data_id
+            if fetch_legacy_posts:
+                logging.warning(
+                    "No posts in 'updates' key. Trying legacy 'google_maps_posts' engine as final fallback."
+                )
 
-        # Tier 1: Check detailed results (modern method)
-        updates_from_details = place_data.get("updates", {})
-        if updates_from_details:
-            all_posts = updates_from_details.get("posts", [])
+            social_links = place_data.get("links", [])
 
-        # Tier 2: Check initial results if Tier 1 fails
-        if not all_posts:
-            logging.warning(
-                "No posts in detailed results. Checking initial results as fallback."
+            # Step 3: Wait for reviews and photo attributions together with the
+            # legacy posts and the social links fallback.
+            legacy_posts_task = asyncio.create_task(
+                self._fetch_posts_by_data_id(data_id, business_title)
+                if fetch_legacy_posts
+                else _no_results()
             )
-            updates_from_initial = first_result.get("updates", {})
-            if updates_from_initial:
-                all_posts = updates_from_initial.get("posts", [])
-
-        # Tier 3: Use legacy engine with data_id if Tiers 1 & 2 fail
-        if not all_posts and data_id:
-            logging.warning(
-                "No posts in 'updates' key. Trying legacy 'google_maps_posts' engine as final fallback."
+            fallback_socials_task = asyncio.create_task(
+                self._fetch_knowledge_graph_socials(query)
+                if not social_links
+                else _no_results()
+            )
+            started_tasks += [legacy_posts_task, fallback_socials_task]
+            all_reviews, legacy_posts, photo_attributions, fallback_socials = (
+                await asyncio.gather(
+                    reviews_task, legacy_posts_task, photos_task, fallback_socials_task
+                )
             )
-            all_posts = self._fetch_posts_by_data_id(data_id, business_title)
+        except BaseException:
+            for task in started_tasks:
+                task.cancel()
+            raise
 
-        if all_posts:
-            logging.info(f"SUCCESS: Found {len(all_posts)} posts.")
-        else:
-            logging.warning("FAILURE: No posts found in any API locations.")
+        recent_reviews_filtered = self._filter_reviews_by_recency(all_reviews)
+        all_posts = all_posts or legacy_posts
 
         if all_posts:
             logging.info(f"SUCCESS: Found {len(all_posts)} posts.")
@@ -270,13 +372,8 @@ class GmbAnalyzer:
                 "FAILURE: No posts were found in any of the checked API locations."
             )
 
-        search_url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
-        photo_attributions = self.photo_scraper.get_attributions_by_navigation(
-            search_url, business_title
-        )
-
         # Step 4: Assemble the final data structure
-        result_data = analysis_result["data"]
+        result_data = analysis_result.data
         result_data["title"] = business_title
         result_data["place_id"] = place_id
         result_data["address"] = place_data.get("address")
@@ -286,10 +383,7 @@ class GmbAnalyzer:
         result_data["reviews_count"] = place_data.get("reviews")
 
         # Social links with fallback
-        social_links = place_data.get("links", [])
-        if not social_links:
-            social_links = self._fetch_knowledge_graph_socials(query)
-        result_data["social_links"] = social_links
+        result_data["social_links"] = social_links or fallback_socials
 
         result_data["recent_reviews_in_last_month_count"] = len(recent_reviews_filtered)
         # Posts
@@ -304,5 +398,5 @@ class GmbAnalyzer:
         )
         result_data["total_photos_analyzed"] = len(photo_attributions)
 
-        analysis_result["success"] = True
+        analysis_result.success = True
         return analysis_result
@@ -1,4 +1,6 @@
 import logging
+from typing import Dict, FrozenSet, Tuple
+
 from fastapi import APIRouter, HTTPException
 
 from src.api.v1.schemas.analyzer_schemas import (
@@ -9,36 +11,48 @@ from src.services.job_status import check_job_status, update_job_status
 
 router = APIRouter()
 
+# In lifecycle order, which is also the order they are listed in errors.
+_STATUS_ORDER: Tuple[str, ...] = (
+    "Pending",
+    "Analysis Started",
+    "Analyzing",
+    "Writing the Analysis",
+    "Analysis Finished",
+    "Analysis Failed",
+)
+ALLOWED_STATUSES: FrozenSet[str] = frozenset(_STATUS_ORDER)
+_ALLOWED_STATUSES_STR = ", ".join(_STATUS_ORDER)
+
+STATUS_MESSAGE: Dict[str, str] = {
+    "Analysis Finished": "Analysis completed successfully",
+    "Analyzing": "Analysis is currently in progress",
+    "Analysis Started": "Analysis has been started",
+    "Writing the Analysis": "Analysis is being finalized",
+    "Pending": "Analysis is pending to start",
+    "Analysis Failed": "Analysis failed due to an error",
+    "not_found": "Job not found",
+}
+
 
 @router.get(
     "/check-status/{job_id}",
     summary="Checks the status of a job",
     response_model=JobstatusResponse,
 )
-def get_job_status(job_id: str):
+async def get_job_status(job_id: str):
     """
     Check the status of an analysis job.
     Returns: Pending, Analysis Started, Analyzing, Writing the Analysis,
     Analysis Finished, or Analysis Failed
     """
 
-    logging.info(f"Checking status for the job: {job_id}")
+    logging.info("Checking status for the job: %s", job_id)
 
     try:
-        result = check_job_status(job_id)
-
-        status_message = {
-            "Analysis Finished": "Analysis completed successfully",
-            "Analyzing": "Analysis is currently in progress",
-            "Analysis Started": "Analysis has been started",
-            "Writing the Analysis": "Analysis is being finalized",
-            "Pending": "Analysis is pending to start",
-            "Analysis Failed": "Analysis failed due to an error",
-            "not_found": "Job not found",
-        }
+        result = await check_job_status(job_id)
 
         status = result.get("status", "Analysis Failed")
-        message = status_message.get(status, "Unknown status")
+        message = STATUS_MESSAGE.get(status, "Unknown status")
 
         if status == "not_found":
             raise HTTPException(status_code=404, detail="Job not found")
@@ -60,7 +74,7 @@ def get_job_status(job_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error checking job status: {e}")
+        logging.error("Error checking job status: %s", e)
 
         raise HTTPException(status_code=500, detail="Failed to check job status")
 
@@ -70,42 +84,37 @@ def get_job_status(job_id: str):
     summary="Updates the status of a job",
     response_model=JobstatusResponse,
 )
-def update_status(job_id: str, request: JobStatusUpdateRequest):
+async def update_status(job_id: str, request: JobStatusUpdateRequest):
     """
     Update the status of an analysis job.
     Allowed statuses: Pending, Analysis Started, Analyzing, Writing the Analysis,
                       Analysis Finished, Analysis Failed
     """
 
-    logging.info(f"Updating status for job {job_id} to: {request.status}")
+    logging.info("Updating status for job %s to: %s", job_id, request.status)
 
-    allowed_statuses = [
-        "Pending",
-        "Analysis Started",
-        "Analyzing",
-        "Writing the Analysis",
-        "Analysis Finished",
-        "Analysis Failed",
-    ]
-
-    if request.status not in allowed_statuses:
+    if request.status not in ALLOWED_STATUSES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid status. Allowed statuses: {', '.join(allowed_statuses)}",
+            detail=f"Invalid status. Allowed statuses: {_ALLOWED_STATUSES_STR}",
         )
 
     try:
-        success = update_job_status(job_id, request.status)
+        success = await update_job_status(job_id, request.status)
 
         if not success:
             raise HTTPException(
                 status_code=404, detail="Job not found or update failed"
             )
 
-        return get_job_status(job_id)
+        return JobstatusResponse(
+            status=request.status,
+            job_id=job_id,
+            message=STATUS_MESSAGE[request.status],
+        )
 
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error updating job status: {e}")
+        logging.error("Error updating job status: %s", e)
         raise HTTPException(status_code=500, detail="Failed to update job status")
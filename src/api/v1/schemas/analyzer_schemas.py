@@ -50,16 +50,20 @@ class AnalysisRequest(BaseModel):
         default=ModelChoice.FLASH,
         description="Choose the LLM to use for the detailed analysis.",
     )
+    include_detailed_analysis: bool = Field(
+        default=False,
+        description="Also generate the LLM detailed analysis. Leave off for a faster score-only analysis.",  # noqa
+    )
 
-    @model_validator(mode="before")
-    def check_exactly_one_field_is_provided(cls, values):
+    @model_validator(mode="after")
+    def check_exactly_one_field_is_provided(self):
         """Ensures that either 'query' or 'place_id' is provided, but not both."""
-        if not values.get("business_name") and not values.get("place_id"):
+        if not self.business_name and not self.place_id:
             raise ValueError(
                 "You must provide at least one of 'business_name' or 'place_id'."
             )
 
-        return values
+        return self
 
 
 class AnalysisResponse(BaseModel):
@@ -76,6 +80,10 @@ class AnalysisResponse(BaseModel):
 
     job_id: Optional[str] = Field("", description="The job ID for the analysis.")
 
+    data: Optional[Dict[str, Any]] = Field(
+        None, description="The analysis data, returned when run inline."
+    )
+
 
 class JobstatusResponse(BaseModel):
     status: str
@@ -115,3 +123,8 @@ class DetailedAnalysisResponse(BaseModel):
     """The response body for the new /detailed-analysis endpoint."""
 
     detailed_analysis: str
+
+
+# Build the core schemas at import time instead of on the first request.
+AnalysisRequest.model_rebuild(force=True)
+AnalysisResponse.model_rebuild(force=True)
@@ -1,4 +1,8 @@
+import logging
 import os
+from functools import cached_property
+from pathlib import Path
+from typing import Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -42,5 +46,49 @@ class Config(BaseSettings):
 
     APP_PORT: int = Field(8000, validation_alias="APP_PORT")
 
+    APP_WORKERS: Optional[int] = Field(None, validation_alias="APP_WORKERS")
+
+    REDIS_URL: Optional[str] = Field(None, validation_alias="REDIS_URL")
+
+    CACHE_DB_PATH: Optional[str] = Field(None, validation_alias="CACHE_DB_PATH")
+
+    ANALYSIS_CACHE_TTL: int = Field(6 * 60 * 60, validation_alias="ANALYSIS_CACHE_TTL")
+
+    LLM_CACHE_TTL: int = Field(24 * 60 * 60, validation_alias="LLM_CACHE_TTL")
+
+    OUTPUT_DIR: str = Field("/app/output", validation_alias="OUTPUT_DIR")
+
+    MAX_BROWSER_CONTEXTS: int = Field(5, validation_alias="MAX_BROWSER_CONTEXTS")
+
+    PHOTO_VIEWER_DIRECT_ENTRY: bool = Field(
+        False, validation_alias="PHOTO_VIEWER_DIRECT_ENTRY"
+    )
+
+    @cached_property
+    def gbp_analysis_prompt(self) -> str:
+        """
+        The GBP analysis prompt template, read from GBP_ANALYSIS_PROMPT_PATH
+        on first access and reused afterwards.
+
+        Returns:
+            str: The content of the prompt file, or a fallback prompt if the
+            file cannot be read.
+        """
+        prompt_path = self.GBP_ANALYSIS_PROMPT_PATH
+
+        try:
+            return Path(prompt_path).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            logging.error(
+                f"CRITICAL: Prompt template file not found at path: '{prompt_path}'"
+            )
+            return "Please provide a professional analysis of the following business data: {business_data_json}"  # noqa
+        except Exception as e:
+            logging.error(f"Error loading prompt template from '{prompt_path}': {e}")
+            return "Error loading prompt."
+
 
 config = Config()
+
+# Read the prompt template once at startup rather than on the first request.
+config.gbp_analysis_prompt
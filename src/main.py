@@ -1,15 +1,59 @@
+import logging
+from contextlib import asynccontextmanager
+
+from arq import create_pool
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from src.api.v1.routers import analyzer
 from src.api.v1.routers import site_socials
 from src.api.v1.routers import llm_analysis
 from src.api.v1.routers import status
+from src.api.v1.routers import metrics
+from src.core.config import config
+from src.scrapers.browser_pool import close_browser
+from src.services.gbp_analyzer import GBPAnalyzer
+from src.services.http_client import close_http_client
+from src.worker import get_redis_settings
+
+logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        app.state.analyzer = GBPAnalyzer(api_key=config.SERP_API_KEY)
+    except ValueError as e:
+        logging.error(f"Could not initialize GBPAnalyzer: {e}")
+        app.state.analyzer = None
+        app.state.analyzer_error = str(e)
+
+    app.state.job_queue = None
+    if config.REDIS_URL:
+        app.state.job_queue = await create_pool(get_redis_settings())
+
+    yield
+    await close_http_client()
+    await close_browser()
+
+    if app.state.job_queue is not None:
+        await app.state.job_queue.aclose()
+
+
+app = FastAPI(
+    title="Google Business Profile Analyzer API",
+    version="0.0.1",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
-app = FastAPI(title="Google Business Profile Analyzer API", version="0.0.1")
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.include_router(analyzer.router, prefix="/v1", tags=["Analyzer"])
 app.include_router(site_socials.router, prefix="/v1", tags=["Socials/Website"])
 app.include_router(llm_analysis.router, prefix="/v1", tags=["LLM Detailed Analysis"])
 app.include_router(status.router, prefix="/v1", tags=["Job Status"])
+app.include_router(metrics.router, prefix="/v1", tags=["Metrics"])
 
 
 app.get("/", tags=["Root"])
@@ -1,3 +1,5 @@
+import os
+
 import uvicorn
 
 from src.core.config import config
@@ -6,9 +8,18 @@ from src.core.config import config
 def start():
     """
     Run the FastAPI application using Uvicorn.
+    Runs one worker process per CPU core unless APP_WORKERS is set, matching
+    the Docker image.
     """
     uvicorn.run(
         "src.main:app",
         host=config.APP_HOST,
         port=config.APP_PORT,
+        workers=config.APP_WORKERS or os.cpu_count() or 1,
+        loop="uvloop",
+        http="httptools",
     )
+
+
+if __name__ == "__main__":
+    start()
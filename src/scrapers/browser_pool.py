@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+_playwright: Optional[Playwright] = None
+_browser: Optional[Browser] = None
+_lock = asyncio.Lock()
+
+# Each context holds its own renderer processes, so the number open at once
+# on the shared browser is capped (MAX_BROWSER_CONTEXTS) to keep memory
+# bounded under batch runs.
+_context_slots: Optional[asyncio.Semaphore] = None
+
+# Contexts left open by finished scrapes, reused by the next ones so their
+# setup and cookies carry over.
+_idle_contexts: List[BrowserContext] = []
+
+
+async def get_browser() -> Browser:
+    """
+    Returns the shared headless Chromium instance, launching it on first use.
+
+    Launching Chromium takes several seconds, so it is done once per process
+    and every scrape opens its own lightweight context on the shared browser.
+
+    Returns:
+        Browser: The process-wide Playwright browser.
+    """
+    global _playwright, _browser
+
+    async with _lock:
+        if _browser is not None and _browser.is_connected():
+            return _browser
+
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+
+        logger.info("Launching shared Chromium browser...")
+        # Using --no-sandbox is often necessary in Docker environments
+        _browser = await _playwright.chromium.launch(
+            headless=True,
+            args=[
+                "--disable-blink-features=AutomationControlled",
+                "--no-sandbox",
+                "--disable-setuid-sandbox",
+                "--disable-dev-shm-usage",  # Recommended for Docker to prevent
+                # shared memory issues
+            ],
+        )
+
+        return _browser
+
+
+@asynccontextmanager
+async def context_slot() -> AsyncIterator[None]:
+    """
+    Waits for one of the MAX_BROWSER_CONTEXTS context slots on the shared
+    browser and holds it for the duration of the `async with` block.
+    """
+    global _context_slots
+
+    if _context_slots is None:
+        _context_slots = asyncio.Semaphore(config.MAX_BROWSER_CONTEXTS)
+
+    async with _context_slots:
+        yield
+
+
+@asynccontextmanager
+async def pooled_context(
+    new_context: Callable[[Browser], Awaitable[BrowserContext]],
+) -> AsyncIterator[BrowserContext]:
+    """
+    Holds a context slot and yields a browser context for the duration of the
+    `async with` block.
+
+    An idle context from an earlier scrape is reused when there is one;
+    otherwise `new_context` creates one on the shared browser. Callers close
+    the pages they open, not the context. A context whose block raised is
+    closed instead of being returned to the pool.
+
+    Args:
+        new_context (Callable[[Browser], Awaitable[BrowserContext]]): Creates
+            and configures a new context on the given browser.
+    """
+    async with context_slot():
+        browser = await get_browser()
+
+        context = None
+        while _idle_contexts and context is None:
+            candidate = _idle_contexts.pop()
+            # Contexts of a browser that has since been relaunched are dead.
+            if candidate.browser is browser:
+                context = candidate
+
+        if context is None:
+            context = await new_context(browser)
+
+        try:
+            yield context
+        except BaseException:
+            await context.close()
+            raise
+
+        _idle_contexts.append(context)
+
+
+async def close_browser() -> None:
+    """
+    Closes the shared browser and stops Playwright.
+    """
+    global _playwright, _browser, _context_slots
+
+    async with _lock:
+        _context_slots = None
+        _idle_contexts.clear()
+
+        if _browser is not None:
+            try:
+                await _browser.close()
+            except Exception as e:
+                logger.warning(f"Failed to close browser cleanly: {e}")
+            _browser = None
+
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
@@ -1,17 +1,101 @@
 import logging
 import os
-from typing import List, Dict
-from playwright.sync_api import (
-    sync_playwright,
+from typing import List, Dict, Optional
+from playwright.async_api import (
     TimeoutError as PlaywrightTimeoutError,
+    Browser,
+    BrowserContext,
     Page,
+    Route,
 )
 import re
 
+from src.core.config import config
+from src.scrapers.browser_pool import pooled_context
+
 # --- Set up basic logging ---
 # It's good practice to get the logger by name for better control in larger apps
 logger = logging.getLogger(__name__)
 
+# Only the page's markup, styles and scripts are needed to read uploader
+# names, so everything else is aborted before it is downloaded.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "manifest"})
+BLOCKED_URL_PARTS = ("doubleclick.net", "google-analytics.com", "googletagmanager.com")
+
+CONSENT_REJECT_PATTERN = re.compile(r"Reject all|Decline all", re.IGNORECASE)
+SEE_PHOTOS_PATTERN = re.compile(r"See all photos|All photos|See photos", re.IGNORECASE)
+
+# Returns the last uploader link if it is visible. Both scripts below record
+# the link they read in `window.__gbpUploader`, so the next wait can tell when
+# the viewer has replaced it.
+VISIBLE_UPLOADER_LINK_SCRIPT = """
+const visibleUploaderLink = (selector) => {
+    const links = document.querySelectorAll(selector);
+    const link = links[links.length - 1];
+    if (!link) {
+        return null;
+    }
+    const box = link.getBoundingClientRect();
+    const visible = box.width > 0 && box.height > 0
+        && getComputedStyle(link).visibility !== "hidden";
+    return visible ? link : null;
+};
+"""
+
+# Waits up to `timeout` ms for the last uploader link to become visible, then
+# returns "Owner" if its text contains the owner name, otherwise "Customer".
+# Returns null if no visible link shows up in time.
+CLASSIFY_UPLOADER_SCRIPT = """
+async ({ selector, ownerName, timeout }) => {
+    %s
+    const deadline = Date.now() + timeout;
+    for (;;) {
+        const link = visibleUploaderLink(selector);
+        if (link) {
+            const text = link.innerText;
+            window.__gbpUploader = { link, text };
+            return text.toLowerCase().includes(ownerName) ? "Owner" : "Customer";
+        }
+        if (Date.now() >= deadline) {
+            return null;
+        }
+        await new Promise((resolve) => setTimeout(resolve, 50));
+    }
+}
+""" % VISIBLE_UPLOADER_LINK_SCRIPT
+
+# True once the URL has moved on from `previousUrl` and the visible uploader
+# link is a different node, or shows different text, than the one last read.
+NEXT_PHOTO_SHOWN_SCRIPT = """
+({ selector, previousUrl }) => {
+    %s
+    if (location.href === previousUrl) {
+        return false;
+    }
+    const link = visibleUploaderLink(selector);
+    if (!link) {
+        return false;
+    }
+    const text = link.innerText;
+    const last = window.__gbpUploader;
+    if (last && last.link === link && last.text === text) {
+        return false;
+    }
+    window.__gbpUploader = { link, text };
+    return true;
+}
+""" % VISIBLE_UPLOADER_LINK_SCRIPT
+
+
+async def _block_unneeded_requests(route: Route) -> None:
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        part in request.url for part in BLOCKED_URL_PARTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
 
 class PhotoScraper:
     """
@@ -22,167 +106,235 @@ class PhotoScraper:
 
     def __init__(self, check_limit: int = 100):
         self.PHOTO_CHECK_LIMIT = check_limit
+        self.PHOTO_SETTLE_TIMEOUT = 500
         self.SELECTORS = {
             "first_photo_in_gallery": 'a[aria-label*="Photo"]',
             "uploader_link": 'a[href*="/contrib/"]',
             "next_button": 'button[aria-label="Next"]',
         }
-        # Define an output directory for screenshots, useful within Docker
-        self.output_dir = os.getenv("OUTPUT_DIR", "/app/output")
-        os.makedirs(self.output_dir, exist_ok=True)
+        # Output directory for error screenshots, useful within Docker. It is
+        # only created when a screenshot is actually saved.
+        self.output_dir = config.OUTPUT_DIR
+        # Cookies saved after a consent banner is dismissed, so new contexts
+        # start out with consent already given.
+        self._storage_state: Optional[dict] = None
 
-    def _get_current_uploader_type(self, page: Page, business_title: str) -> str:
+    async def _get_current_uploader_type(self, page: Page, owner_name: str) -> str:
         """
         Analyzes the currently visible photo in the viewer and determines if the
         uploader is the Owner or a Customer.
+
+        The wait for the uploader link, the name read and the comparison all
+        run inside the page, so each photo costs a single round trip.
+
+        Args:
+            page (Page): The page with the photo viewer open.
+            owner_name (str): The business title, already stripped and
+                lowercased by the caller to match the in-page toLowerCase().
         """
-        try:
-            uploader_link = page.locator(self.SELECTORS["uploader_link"]).last
-            uploader_link.wait_for(state="visible", timeout=2500)
-            uploader_name = uploader_link.inner_text()
-            if business_title.strip().lower() in uploader_name.strip().lower():
-                return "Owner"
-            else:
-                return "Customer"
-        except PlaywrightTimeoutError:
+        uploader_type = await page.evaluate(
+            CLASSIFY_UPLOADER_SCRIPT,
+            {
+                "selector": self.SELECTORS["uploader_link"],
+                "ownerName": owner_name,
+                "timeout": 2500,
+            },
+        )
+        if uploader_type is None:
             logger.warning(
                 "   -> No uploader link found. Defaulting to Owner (likely a video/360 view)."  # noqa
             )
             return "Owner"
 
-    def get_attributions_by_navigation(
+        return uploader_type
+
+    async def _wait_for_next_photo(self, page: Page, previous_url: str) -> None:
+        """
+        Waits for the viewer to move on from `previous_url`, either the
+        previous photo or the page the viewer was opened from.
+
+        The viewer puts the current photo's id in the URL, but the URL can
+        change before the uploader link is re-rendered. So this also waits for
+        the uploader link to differ from the one last read, and returns as soon
+        as both have changed. Otherwise, e.g. for consecutive photos whose
+        uploader link is reused unchanged, it gives up after
+        PHOTO_SETTLE_TIMEOUT ms.
+        """
+        try:
+            await page.wait_for_function(
+                NEXT_PHOTO_SHOWN_SCRIPT,
+                arg={
+                    "selector": self.SELECTORS["uploader_link"],
+                    "previousUrl": previous_url,
+                },
+                timeout=self.PHOTO_SETTLE_TIMEOUT,
+            )
+        except PlaywrightTimeoutError:
+            pass
+
+    async def get_attributions_by_navigation(
         self, place_id: str, business_title: str
     ) -> List[Dict]:
         """
         Main function using the robust "click Next" strategy.
         Constructs a direct URL using the Place ID for stability.
+        Runs in a pooled context on the shared browser from `browser_pool`;
+        concurrent scrapes (e.g. from `analyze_many`) wait for a free context
+        slot instead of opening an unbounded number of contexts.
         """
+        async with pooled_context(self._new_context) as context:
+            return await self._scrape_attributions(context, place_id, business_title)
+
+    async def _new_context(self, browser: Browser) -> BrowserContext:
+        context = await browser.new_context(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",  # noqa
+            viewport={"width": 1280, "height": 720},
+            locale="en-US",
+            # Asks the page to skip its animations, so there is less to
+            # render between clicks.
+            reduced_motion="reduce",
+            storage_state=self._storage_state,
+        )
+        # Installed on the context so it covers every page opened on it.
+        await context.route("**/*", _block_unneeded_requests)
+        return context
+
+    async def _scrape_attributions(
+        self, context: BrowserContext, place_id: str, business_title: str
+    ) -> List[Dict]:
         direct_url = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
         logger.info(f"Starting scraper for Place ID: {place_id}")
         logger.info(f"Using direct URL: {direct_url}")
 
         attributions = []
-        with sync_playwright() as p:
-            browser = None
-            try:
-                # Using --no-sandbox is often necessary in Docker environments
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=[
-                        "--disable-blink-features=AutomationControlled",
-                        "--no-sandbox",
-                        "--disable-setuid-sandbox",
-                        "--disable-dev-shm-usage",  # Recommended for Docker to prevent
-                        # shared memory issues
-                    ],
-                )
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",  # noqa
-                    viewport={"width": 1280, "height": 720},
-                    locale="en-US",
-                )
-                page = context.new_page()
+        page = None
+        try:
+            page = await context.new_page()
 
-                # Aborting image/font requests is a key optimization for speed
-                # and resource use
-                page.route(
-                    "**/*.{png,jpg,jpeg,gif,svg,woff,woff2}",
-                    lambda route: route.abort(),
-                )
-                page.goto(direct_url, wait_until="domcontentloaded", timeout=45000)
+            await page.goto(direct_url, wait_until="domcontentloaded", timeout=45000)
 
-                try:
-                    logger.info("Attempting to dismiss cookie/consent banners...")
-                    page.get_by_role(
-                        "button",
-                        name=re.compile(r"Reject all|Decline all", re.IGNORECASE),
-                    ).first.click(timeout=5000)
-                    logger.info("Dismissed a consent banner.")
-                except PlaywrightTimeoutError:
-                    logger.warning("No cookie/consent banner found to dismiss.")
-                    pass
+            consent_button = page.get_by_role(
+                "button", name=CONSENT_REJECT_PATTERN
+            ).first
+            main_content = page.locator('div[role="main"]').first
 
-                logger.info("Waiting for the main business profile content to load...")
-                page.locator('div[role="main"]').first.wait_for(
-                    state="visible", timeout=20000
-                )
-                logger.info("Main content loaded.")
+            # Wait for whichever of the consent banner and the business profile
+            # shows up first, so pages without a banner don't sit out a timeout.
+            logger.info("Waiting for a consent banner or the main profile content...")
+            await consent_button.or_(main_content).first.wait_for(
+                state="visible", timeout=20000
+            )
 
-                viewer_opened_directly = False
-                try:
-                    page.get_by_role(
-                        "button",
-                        name=re.compile(
-                            r"See all photos|All photos|See photos", re.IGNORECASE
-                        ),
-                    ).first.click(timeout=7000)
-                    logger.info("'See all photos' button found and clicked.")
+            if await consent_button.is_visible():
+                await consent_button.click(timeout=5000)
+                logger.info("Dismissed a consent banner.")
 
-                except PlaywrightTimeoutError:
-                    logger.warning("'See all photos' button not found.")
-                    try:
-                        page.get_by_role("tab", name="Photos").first.click(timeout=7000)
-                        logger.info("'Photos' tab found and clicked.")
-                    except PlaywrightTimeoutError:
-                        logger.warning("'Photos' tab not found.")
-                        page.locator(
-                            'button[jsaction*="pane.heroHeaderImage.click"]'
-                        ).first.click(timeout=10000)
-                        logger.info("Main hero image found and clicked.")
-                        viewer_opened_directly = True
-
-                if not viewer_opened_directly:
-                    logger.info("Entering photo viewer from gallery grid...")
-                    page.locator(self.SELECTORS["first_photo_in_gallery"]).first.click(
-                        timeout=10000
-                    )
-                else:
-                    logger.info("Photo viewer was opened directly by the main image.")
+                # The clicks below wait for their own targets to be visible, so
+                # the profile only needs to be in the DOM here.
+                await main_content.wait_for(state="attached", timeout=20000)
+                # The consent cookie is set by the time the profile loads.
+                self._storage_state = await context.storage_state()
+            else:
+                logger.info("No cookie/consent banner found to dismiss.")
 
-                logger.info("Photo viewer is open. Starting 'Next' loop...")
+            logger.info("Main content loaded.")
 
-                for i in range(self.PHOTO_CHECK_LIMIT):
-                    page.wait_for_timeout(500)
+            see_photos_button = page.get_by_role(
+                "button", name=SEE_PHOTOS_PATTERN
+            ).first
+            photos_tab = page.get_by_role("tab", name="Photos").first
+            hero_image = page.locator(
+                'button[jsaction*="pane.heroHeaderImage.click"]'
+            ).first
 
-                    logger.info(f"---> Analyzing photo {i+1}...")
-                    uploader_type = self._get_current_uploader_type(
-                        page, business_title
-                    )
-                    attributions.append({"uploader": uploader_type})
-                    logger.info(f"   -> Classified as: {uploader_type}")
+            # Wait once for any of the photo entry points rather than giving
+            # each its own timeout in turn, then use the preferred one shown.
+            await see_photos_button.or_(photos_tab).or_(hero_image).first.wait_for(
+                state="visible", timeout=10000
+            )
 
-                    if i >= self.PHOTO_CHECK_LIMIT - 1:
-                        logger.info("Reached photo check limit.")
-                        break
+            # The URL the viewer navigates away from once it shows a photo.
+            url_before_viewer = page.url
+
+            # The hero image opens the viewer in one click, skipping the
+            # gallery grid. Maps' layout shifts over time, so this shortcut is
+            # opt-in through PHOTO_VIEWER_DIRECT_ENTRY.
+            viewer_opened_directly = False
+            if config.PHOTO_VIEWER_DIRECT_ENTRY and await hero_image.is_visible():
+                await hero_image.click(timeout=10000)
+                logger.info("Main hero image clicked to open the viewer directly.")
+                viewer_opened_directly = True
+            elif await see_photos_button.is_visible():
+                await see_photos_button.click(timeout=7000)
+                logger.info("'See all photos' button found and clicked.")
+            elif await photos_tab.is_visible():
+                logger.warning("'See all photos' button not found.")
+                await photos_tab.click(timeout=7000)
+                logger.info("'Photos' tab found and clicked.")
+            else:
+                logger.warning("'See all photos' button and 'Photos' tab not found.")
+                await hero_image.click(timeout=10000)
+                logger.info("Main hero image found and clicked.")
+                viewer_opened_directly = True
+
+            if not viewer_opened_directly:
+                logger.info("Entering photo viewer from gallery grid...")
+                url_before_viewer = page.url
+                await page.locator(
+                    self.SELECTORS["first_photo_in_gallery"]
+                ).first.click(timeout=10000)
+            else:
+                logger.info("Photo viewer was opened directly by the main image.")
+
+            logger.info("Photo viewer is open. Starting 'Next' loop...")
 
-                    try:
-                        next_button = page.locator(self.SELECTORS["next_button"])
-                        next_button.wait_for(state="visible", timeout=2500)
+            # Normalized once here rather than for every photo in the loop.
+            owner_name = business_title.strip().lower()
+            # Locators are lazy queries, re-resolved on every use, so this is
+            # built once for the whole loop.
+            next_button = page.locator(self.SELECTORS["next_button"])
+            await self._wait_for_next_photo(page, url_before_viewer)
 
-                        if not next_button.is_enabled():
-                            logger.info(
-                                "'Next' button is disabled. End of gallery reached."
-                            )
-                            break
+            for i in range(self.PHOTO_CHECK_LIMIT):
+                logger.debug("---> Analyzing photo %d...", i + 1)
+                uploader_type = await self._get_current_uploader_type(page, owner_name)
+                attributions.append({"uploader": uploader_type})
+                logger.debug("   -> Classified as: %s", uploader_type)
 
-                        next_button.click()
+                if i >= self.PHOTO_CHECK_LIMIT - 1:
+                    logger.info("Reached photo check limit.")
+                    break
 
-                    except PlaywrightTimeoutError:
+                try:
+                    await next_button.wait_for(state="visible", timeout=2500)
+
+                    if not await next_button.is_enabled():
                         logger.info(
-                            "Could not find a visible 'Next' button. Assuming end of gallery."  # noqa
+                            "'Next' button is disabled. End of gallery reached."
                         )
                         break
 
-            except Exception as e:
-                logger.error(f"Critical error during scraping process: {e}")
-                if "page" in locals() and not page.is_closed():
-                    screenshot_path = os.path.join(
-                        self.output_dir, f"fatal_error_{place_id}.png"
+                    photo_url = page.url
+                    await next_button.click()
+                    await self._wait_for_next_photo(page, photo_url)
+
+                except PlaywrightTimeoutError:
+                    logger.info(
+                        "Could not find a visible 'Next' button. Assuming end of gallery."  # noqa
                     )
-                    page.screenshot(path=screenshot_path)
-                    logger.info(f"Screenshot saved to {screenshot_path}")
-            finally:
-                if browser:
-                    browser.close()
+                    break
+
+        except Exception as e:
+            logger.error(f"Critical error during scraping process: {e}")
+            if page is not None and not page.is_closed():
+                os.makedirs(self.output_dir, exist_ok=True)
+                screenshot_path = os.path.join(
+                    self.output_dir, f"fatal_error_{place_id}.png"
+                )
+                await page.screenshot(path=screenshot_path)
+                logger.info(f"Screenshot saved to {screenshot_path}")
+        finally:
+            if page is not None:
+                await page.close()
         logger.info("Photo scraping finished.")
         return attributions
@@ -0,0 +1,161 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+import redis.asyncio as redis
+
+from src.core.config import config
+
+# Values are orjson payloads, which orjson parses straight from bytes, so
+# responses are not decoded to str first.
+redis_client: Optional[redis.Redis] = (
+    redis.from_url(config.REDIS_URL) if config.REDIS_URL else None
+)
+
+# Used when REDIS_URL is not configured: {key: (expires_at, value)}, kept in
+# least-recently-used order and capped so a long-running process doesn't
+# accumulate every SerpApi response it has ever seen.
+MEMORY_CACHE_MAX_ENTRIES = 2048
+_memory_cache: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+# Used instead of the in-process cache when CACHE_DB_PATH is set, so cached
+# responses survive restarts of single-process setups such as the CLI.
+_disk_cache: Optional[sqlite3.Connection] = None
+_disk_cache_lock = threading.Lock()
+
+cache_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """
+    Normalizes a free-text business query so that trivial differences in
+    casing or spacing map to the same cache entry.
+    """
+    return " ".join(query.lower().split()) if query else ""
+
+
+def make_cache_key(namespace: str, *parts: Any) -> str:
+    """
+    Builds a namespaced cache key from the given parts.
+
+    Args:
+        namespace (str): The cache namespace, used for hit/miss counters.
+        *parts: The values that identify the cached entry.
+
+    Returns:
+        str: A key of the form "<namespace>:<sha256 of parts>".
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f"{namespace}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+def _get_disk_cache() -> sqlite3.Connection:
+    global _disk_cache
+
+    if _disk_cache is None:
+        Path(config.CACHE_DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+        _disk_cache = sqlite3.connect(config.CACHE_DB_PATH, check_same_thread=False)
+        _disk_cache.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, expires_at REAL, payload BLOB)"
+        )
+        _disk_cache.execute(
+            "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+        )
+        # Entries are only overwritten when their key comes up again, so rows
+        # that expired since the last run are dropped here.
+        _disk_cache.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        _disk_cache.commit()
+
+    return _disk_cache
+
+
+def _disk_get(key: str) -> Optional[Any]:
+    with _disk_cache_lock:
+        connection = _get_disk_cache()
+        row = connection.execute(
+            "SELECT expires_at, payload FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is not None and row[0] <= time.time():
+            connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            connection.commit()
+            row = None
+
+    if row is None:
+        return None
+
+    return orjson.loads(gzip.decompress(row[1]))
+
+
+def _disk_set(key: str, value: Any, ttl: int) -> None:
+    payload = gzip.compress(orjson.dumps(value))
+
+    with _disk_cache_lock:
+        connection = _get_disk_cache()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+            (key, time.time() + ttl, payload),
+        )
+        connection.commit()
+
+
+def _record(key: str, hit: bool) -> None:
+    namespace = key.split(":", 1)[0]
+    cache_stats[namespace]["hits" if hit else "misses"] += 1
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """
+    Returns the cached value for a key, or None on a miss.
+    Cache backend errors are logged and treated as a miss.
+    """
+    value = None
+
+    try:
+        if redis_client is not None:
+            raw = await redis_client.get(key)
+            value = orjson.loads(raw) if raw is not None else None
+        elif config.CACHE_DB_PATH:
+            value = await asyncio.to_thread(_disk_get, key)
+        else:
+            entry = _memory_cache.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at <= time.monotonic():
+                    _memory_cache.pop(key, None)
+                    value = None
+                else:
+                    _memory_cache.move_to_end(key)
+    except Exception as e:
+        logging.warning(f"Cache read failed for {key}: {e}")
+        value = None
+
+    _record(key, value is not None)
+    return value
+
+
+async def cache_set(key: str, value: Any, ttl: int) -> None:
+    """
+    Stores a JSON-serializable value under a key for `ttl` seconds.
+    """
+    try:
+        if redis_client is not None:
+            await redis_client.setex(key, ttl, orjson.dumps(value))
+        elif config.CACHE_DB_PATH:
+            await asyncio.to_thread(_disk_set, key, value, ttl)
+        else:
+            _memory_cache[key] = (time.monotonic() + ttl, value)
+            _memory_cache.move_to_end(key)
+            while len(_memory_cache) > MEMORY_CACHE_MAX_ENTRIES:
+                _memory_cache.popitem(last=False)
+    except Exception as e:
+        logging.warning(f"Cache write failed for {key}: {e}")
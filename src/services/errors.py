@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class ServiceError(str, Enum):
+    """
+    Error codes returned by the service layer alongside a human-readable
+    `error` message, so callers can branch on the kind of failure without
+    matching message text.
+    """
+
+    INVALID_INPUT = "invalid_input"
+    NOT_FOUND = "not_found"
+    UPSTREAM = "upstream"
+    INTERNAL = "internal"
@@ -1,30 +1,26 @@
+import asyncio
 import logging
 import traceback
-from concurrent.futures import (
-    ProcessPoolExecutor,
-    ThreadPoolExecutor,
-)
 from typing import Optional
 
 from src.utils.analyzer_helper import (
     _safe_get_nested_value,
-    _fetch_all_posts,
-    _fetch_all_reviews,
+    _count_recent_posts,
+    _first_search_result,
+    _count_recent_reviews,
     _get_social_links,
     _run_photo_scraper,
-    _filter_reviews_by_recency,
-    _filter_posts_by_recency,
     _get_photo_counts,
     _safe_api_call,
 )
 from src.utils.computation import calculate_score
 from src.services.supabase import supabase, insert_data
-from src.services.job_status import update_job_status
+from src.services.cache import cache_set
+from src.services.errors import ServiceError
+from src.services.job_status import cache_job_status, update_job_status
 from src.services.llm_detailed_analysis import get_llm_analysis
 from src.core.config import config
 
-logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
-
 
 class GBPAnalyzer:
     """
@@ -38,7 +34,75 @@ class GBPAnalyzer:
 
         self.api_key = api_key
 
-    def create_analysis_job(
+    async def _search_place(self, query: str) -> dict:
+        """
+        Resolves a free-text query to a Google Business Profile.
+
+        Args:
+            query (str): The business search query.
+
+        Returns:
+            dict: {"success": True, "place_id": str, "place_data": dict | None,
+            "search_result": dict} on success, where `place_data` holds the
+            full place details when the search was an exact match and
+            `search_result` is the matched result itself. Otherwise an error
+            dict with `error_code` and `error`.
+        """
+        search_params = {
+            "engine": "google_maps",
+            "q": query,
+            "type": "search",
+            "api_key": self.api_key,
+        }
+        initial_results = await _safe_api_call(search_params, "initial search")
+        if not initial_results:
+            return {
+                "success": False,
+                "error_code": ServiceError.NOT_FOUND,
+                "error": f"No results for query: '{query}'",
+            }
+
+        initial_search_result = _first_search_result(initial_results)
+        if not initial_search_result:
+            return {
+                "success": False,
+                "error_code": ServiceError.NOT_FOUND,
+                "error": f"No GBP found for query: '{query}'",
+            }
+
+        place_id = initial_search_result.get("place_id")
+        if not place_id:
+            return {
+                "success": False,
+                "error_code": ServiceError.NOT_FOUND,
+                "error": "Could not extract place_id from search results.",
+            }
+
+        return {
+            "success": True,
+            "place_id": place_id,
+            # An exact match already carries the full place details.
+            "place_data": initial_results.get("place_results"),
+            "search_result": initial_search_result,
+        }
+
+    async def _fetch_place_details(self, place_id: str) -> dict:
+        """
+        Fetches the full place details for a place_id.
+
+        Returns:
+            dict: The `place_results` block, or an empty dict on failure.
+        """
+        details_params = {
+            "engine": "google_maps",
+            "place_id": place_id,
+            "api_key": self.api_key,
+        }
+        details_results = await _safe_api_call(details_params, "place details")
+
+        return details_results.get("place_results", {})
+
+    async def create_analysis_job(
         self,
         business_name: Optional[str] = None,
         place_id: Optional[str] = None,
@@ -66,42 +130,15 @@ class GBPAnalyzer:
                 if not business_name:
                     return {
                         "success": False,
+                        "error_code": ServiceError.INVALID_INPUT,
                         "error": "Either business_name or place_id must be provided.",
                     }
 
-                search_params = {
-                    "engine": "google_maps",
-                    "q": business_name,
-                    "type": "search",
-                    "api_key": self.api_key,
-                }
+                resolved = await self._search_place(business_name)
+                if not resolved["success"]:
+                    return resolved
 
-                initial_results = _safe_api_call(search_params, "initial search")
-
-                if not initial_results:
-                    return {
-                        "success": False,
-                        "error": f"No results for business_name: '{business_name}'",
-                    }
-
-                initial_search_result = (
-                    initial_results.get("place_results")
-                    or (initial_results.get("local_results", [])[0:1] or [None])[0]
-                )
-
-                if not initial_search_result:
-                    return {
-                        "success": False,
-                        "error": f"No GBP found for business_name: '{business_name}'",
-                    }
-
-                resolved_place_id = initial_search_result.get("place_id")
-
-                if not resolved_place_id:
-                    return {
-                        "success": False,
-                        "error": "Could not extract place_id from search results.",
-                    }
+                resolved_place_id = resolved["place_id"]
 
             placeholder_data = {
                 "place_id": resolved_place_id,
@@ -121,19 +158,24 @@ class GBPAnalyzer:
                 "attributes_count": 0,
             }
 
-            supabase.table("GBP-results").upsert(
-                [placeholder_data], on_conflict="place_id"
-            ).execute()
+            await asyncio.to_thread(
+                supabase.table("GBP-results")
+                .upsert([placeholder_data], on_conflict="place_id")
+                .execute
+            )
 
             status = "Pending"
             job_data = {"place_id": resolved_place_id, "status": status}
-            result = supabase.table("jobs").insert(job_data).execute()
+            result = await asyncio.to_thread(
+                supabase.table("jobs").insert(job_data).execute
+            )
 
             if result.data and len(result.data) > 0:
                 job_id = result.data[0].get("id")
                 logging.info(
                     f"Created analysis job {job_id} for place_id: {resolved_place_id}"
                 )
+                await cache_job_status(str(job_id), status, resolved_place_id)
 
                 return {
                     "success": True,
@@ -143,13 +185,21 @@ class GBPAnalyzer:
                     "place_id": resolved_place_id,
                 }
             else:
-                return {"success": False, "error": "Failed to create job record"}
+                return {
+                    "success": False,
+                    "error_code": ServiceError.INTERNAL,
+                    "error": "Failed to create job record",
+                }
 
         except Exception as e:
             logging.error(f"Failed to create analysis job: {e}")
-            return {"success": False, "error": f"Job creation failed: {str(e)}"}
+            return {
+                "success": False,
+                "error_code": ServiceError.INTERNAL,
+                "error": f"Job creation failed: {str(e)}",
+            }
 
-    def run_background_analysis(
+    async def run_background_analysis(
         self,
         job_id: str,
         business_name: Optional[str] = None,
@@ -158,24 +208,29 @@ class GBPAnalyzer:
         star_rating: Optional[float] = None,
         review_count: Optional[int] = None,
         phone_number: Optional[str] = None,
+        cache_key: Optional[str] = None,
+        include_llm_analysis: bool = True,
     ) -> None:
         """
         Run the complete analysis in the background and update job status.
         This method is designed to be called as a background task.
+        When `cache_key` is given, the finished job is cached under it so
+        identical requests can reuse the result.
         """
 
         try:
-            update_job_status(job_id, "Analysis Started")
+            await update_job_status(job_id, "Analysis Started")
 
-            update_job_status(job_id, "Analyzing")
+            await update_job_status(job_id, "Analyzing")
 
-            result = self.analyze(
+            result = await self.analyze(
                 query=business_name,
                 place_id=place_id,
                 user_provided_address=address,
                 user_provided_rating=star_rating,
                 user_provided_reviews=review_count,
                 user_provided_phone=phone_number,
+                include_llm_analysis=include_llm_analysis,
             )
 
             if not result or not result.get("success"):
@@ -185,44 +240,52 @@ class GBPAnalyzer:
                     else "Analysis returned no result"
                 )
                 logging.error(f"Analysis failed for job {job_id}: {error_message}")
-                update_job_status(job_id, "Analysis Failed")
+                await update_job_status(job_id, "Analysis Failed")
 
                 return
 
             business_data = result.get("data")
             if not business_data:
                 logging.error(f"No business data returned for job {job_id}")
-                update_job_status(job_id, "Analysis Failed")
+                await update_job_status(job_id, "Analysis Failed")
                 return
 
             real_place_id = business_data.get("place_id")
             if real_place_id:
                 try:
-                    supabase.table("jobs").update({"place_id": real_place_id}).eq(
-                        "id", job_id
-                    ).execute()
+                    await asyncio.to_thread(
+                        supabase.table("jobs")
+                        .update({"place_id": real_place_id})
+                        .eq("id", job_id)
+                        .execute
+                    )
                     logging.info(f"Updated job {job_id} place_id to {real_place_id}")
 
                 except Exception as e:
                     logging.warning(f"Failed to update job place_id: {e}")
 
-            update_job_status(job_id, "Writing the Analysis")
+            await update_job_status(job_id, "Writing the Analysis")
 
             try:
-                insert_data("GBP-results", business_data)
+                await asyncio.to_thread(insert_data, "GBP-results", business_data)
                 logging.info(f"Successfully saved business data for job {job_id}")
 
-                update_job_status(job_id, "Analysis Finished")
+                await update_job_status(job_id, "Analysis Finished")
+
+                if cache_key:
+                    await cache_set(
+                        cache_key, {"job_id": job_id}, config.ANALYSIS_CACHE_TTL
+                    )
 
             except Exception as e:
                 logging.error(f"Failed to save business data for job {job_id}: {e}")
-                update_job_status(job_id, "Analysis Failed")
+                await update_job_status(job_id, "Analysis Failed")
 
         except Exception as e:
             logging.error(f"Background analysis failed for job {job_id}: {e}")
-            update_job_status(job_id, "Analysis Failed")
+            await update_job_status(job_id, "Analysis Failed")
 
-    def analyze(
+    async def analyze(
         self,
         query: Optional[str] = None,
         place_id: Optional[str] = None,
@@ -230,124 +293,133 @@ class GBPAnalyzer:
         user_provided_rating: Optional[float] = None,
         user_provided_reviews: Optional[int] = None,
         user_provided_phone: Optional[str] = None,
+        include_llm_analysis: bool = True,
     ) -> dict:
+        """
+        Collects, scores and analyzes a Google Business Profile.
+        Pass `include_llm_analysis=False` to skip the Gemini analysis, e.g.
+        when the caller streams it separately.
+        """
         try:
             # --- Initial Search and Data Fetching (remains the same) ---
             if not place_id:
                 if not query:
                     return {
                         "success": False,
+                        "error_code": ServiceError.INVALID_INPUT,
                         "error": "Query or place_id must be provided.",
                     }
-                search_params = {
-                    "engine": "google_maps",
-                    "q": query,
-                    "type": "search",
-                    "api_key": self.api_key,
-                }
-                initial_results = _safe_api_call(search_params, "initial search")
-                if not initial_results:
-                    return {
-                        "success": False,
-                        "error": f"No results for query: '{query}'",
-                    }
-                initial_search_result = (
-                    initial_results.get("place_results")
-                    or (initial_results.get("local_results", [])[0:1] or [None])[0]
+                resolved = await self._search_place(query)
+                if not resolved["success"]:
+                    return resolved
+
+                place_id = resolved["place_id"]
+                place_data = resolved["place_data"]
+                search_result = resolved["search_result"]
+            else:
+                place_data = None
+                search_result = {}
+
+            # Reviews only need the place_id, so they start loading while the
+            # details lookup below is still in flight.
+            reviews_task = asyncio.create_task(
+                asyncio.wait_for(
+                    _count_recent_reviews(place_id, self.api_key), timeout=60
                 )
-                if not initial_search_result:
+            )
+            # Started tasks keep running on their own, so if this analysis
+            # fails or is cancelled before they all finish, they are cancelled
+            # too rather than left detached (e.g. holding a browser context).
+            started_tasks = [reviews_task]
+            try:
+                # Photos and posts also need the title and data_id. A search
+                # result already carries both, so they can start right away too.
+                photos_task = posts_task = None
+                search_title = search_result.get("title")
+                search_data_id = search_result.get("data_id")
+                if search_title and search_data_id:
+                    photos_task = asyncio.create_task(
+                        asyncio.wait_for(
+                            _run_photo_scraper(place_id, search_title), timeout=320
+                        )
+                    )
+                    posts_task = asyncio.create_task(
+                        _count_recent_posts(search_data_id, search_title, self.api_key)
+                    )
+                    started_tasks += [photos_task, posts_task]
+
+                if not place_data:
+                    place_data = await self._fetch_place_details(place_id)
+                if not place_data:
+                    for task in started_tasks:
+                        task.cancel()
                     return {
                         "success": False,
-                        "error": f"No GBP found for query: '{query}'",
+                        "error_code": ServiceError.UPSTREAM,
+                        "error": f"Could not fetch data for place_id: {place_id}",
                     }
-                place_id = initial_search_result.get("place_id")
-                if not place_id:
-                    return {"success": False, "error": "Could not extract place_id."}
-            else:
-                initial_search_result = None
-
-            details_params = {
-                "engine": "google_maps",
-                "place_id": place_id,
-                "api_key": self.api_key,
-            }
-            details_results = _safe_api_call(details_params, "place details")
-            place_data = details_results.get("place_results", {})
-            if not place_data:
-                return {
-                    "success": False,
-                    "error": f"Could not fetch data for place_id: {place_id}",
-                }
 
-            # --- Safe Data Extraction (calls are now to standalone functions) ---
-            business_title = _safe_get_nested_value(
-                place_data, "title", "Unknown Business"
-            )
-            address = user_provided_address or _safe_get_nested_value(
-                place_data, "address", "Unknown Address"
-            )
-
-            # --- Concurrent Operations ---
-            with (
-                ThreadPoolExecutor(max_workers=2) as api_executor,
-                ProcessPoolExecutor(max_workers=1) as scraper_executor,
-            ):
-                # Calls are updated to pass self.api_key where needed
-                review_future = api_executor.submit(
-                    _fetch_all_reviews, place_id, self.api_key
+                # --- Safe Data Extraction (calls are now to standalone functions) ---
+                business_title = _safe_get_nested_value(
+                    place_data, "title", "Unknown Business"
                 )
-                social_future = api_executor.submit(
-                    _get_social_links, place_data, business_title, address, self.api_key
+                address = user_provided_address or _safe_get_nested_value(
+                    place_data, "address", "Unknown Address"
                 )
-                photo_future = scraper_executor.submit(
-                    _run_photo_scraper, place_id, business_title
-                )
-
-                all_reviews = review_future.result(timeout=60)
-                social_links = social_future.result(timeout=30)
-                photo_attributions = photo_future.result(timeout=320)
-
-            # --- Post Extraction ---
-            data_id = _safe_get_nested_value(place_data, "data_id")
-            all_posts = _fetch_all_posts(data_id, business_title, self.api_key)
-            recent_posts_count = _filter_posts_by_recency(all_posts)
-            extensions_data = _safe_get_nested_value(place_data, "extensions", [])
 
-            attributes_list = []
-            if extensions_data and isinstance(extensions_data, list):
-                for item in extensions_data:
-                    if isinstance(item, dict):
-                        for attribute_group in item.values():
-                            if isinstance(attribute_group, list):
-                                attributes_list.extend(attribute_group)
+                data_id = _safe_get_nested_value(place_data, "data_id")
 
-            result_data = {
-                "title": business_title,
-                "place_id": place_id,
-                "address": address,
-                "phone": user_provided_phone
-                or _safe_get_nested_value(place_data, "phone"),
-                "website": _safe_get_nested_value(place_data, "website"),
-                "description": _safe_get_nested_value(place_data, "description"),
-                "attributes_count": len(attributes_list),
-                "rating": user_provided_rating
-                or _safe_get_nested_value(place_data, "rating", 0.0),
-                "reviews_count": user_provided_reviews
-                or _safe_get_nested_value(place_data, "reviews", 0),
-                "social_links": social_links,
-                "recent_reviews_in_last_month_count": len(
-                    _filter_reviews_by_recency(all_reviews)
-                ),
-                "posts_count": recent_posts_count,
-                "photo_counts_by_uploader": _get_photo_counts(
-                    business_title, photo_attributions
-                ),
-                "total_photos_analyzed": len(photo_attributions),
-            }
-
-            score = calculate_score(result_data)
+                # --- Concurrent Operations ---
+                # SerpApi calls and the photo scraper share the event loop. Photos
+                # and posts not already started from the search result are
+                # fetched alongside the rest using the details.
+                if photos_task is None:
+                    photos_task = asyncio.create_task(
+                        asyncio.wait_for(
+                            _run_photo_scraper(place_id, business_title), timeout=320
+                        )
+                    )
+                    posts_task = asyncio.create_task(
+                        _count_recent_posts(data_id, business_title, self.api_key)
+                    )
+                    started_tasks += [photos_task, posts_task]
+                socials_task = asyncio.create_task(
+                    asyncio.wait_for(
+                        _get_social_links(
+                            place_data, business_title, address, self.api_key
+                        ),
+                        timeout=30,
+                    )
+                )
+                started_tasks.append(socials_task)
+
+                (
+                    recent_reviews_count,
+                    social_links,
+                    photo_attributions,
+                    recent_posts_count,
+                ) = await asyncio.gather(
+                    reviews_task, socials_task, photos_task, posts_task
+                )
+            except BaseException:
+                for task in started_tasks:
+                    task.cancel()
+                raise
+
+            extensions_data = _safe_get_nested_value(place_data, "extensions") or []
+            if not isinstance(extensions_data, list):
+                extensions_data = []
+
+            # Only the number of attributes is scored, so the groups are
+            # counted in place instead of being flattened into a new list.
+            attributes_count = sum(
+                len(attribute_group)
+                for item in extensions_data
+                if isinstance(item, dict)
+                for attribute_group in item.values()
+                if isinstance(attribute_group, list)
+            )
 
-            # --- Final Assembly ---
             output = {
                 "title": business_title,
                 "place_id": place_id,
@@ -356,48 +428,32 @@ class GBPAnalyzer:
                 or _safe_get_nested_value(place_data, "phone"),
                 "website": _safe_get_nested_value(place_data, "website"),
                 "description": _safe_get_nested_value(place_data, "description"),
-                "attributes_count": len(attributes_list),
+                "attributes_count": attributes_count,
                 "rating": user_provided_rating
                 or _safe_get_nested_value(place_data, "rating", 0.0),
                 "reviews_count": user_provided_reviews
                 or _safe_get_nested_value(place_data, "reviews", 0),
                 "social_links": social_links,
-                "recent_reviews": len(_filter_reviews_by_recency(all_reviews)),
+                "recent_reviews": recent_reviews_count,
                 "posts_count": recent_posts_count,
                 "photo_counts_by_uploader": _get_photo_counts(
                     business_title, photo_attributions
                 ),
                 "total_photos_analyzed": len(photo_attributions),
-                "score": score,
             }
 
-            llm_analysis = get_llm_analysis(
-                business_data=output, model_choice=config.GEMINI_MODEL_FLASH
+            # The scoring function reads review recency under its own key.
+            output["score"] = calculate_score(
+                {**output, "recent_reviews_in_last_month_count": recent_reviews_count}
             )
 
-            final_output = {
-                "title": business_title,
-                "place_id": place_id,
-                "address": address,
-                "phone": user_provided_phone
-                or _safe_get_nested_value(place_data, "phone"),
-                "website": _safe_get_nested_value(place_data, "website"),
-                "description": _safe_get_nested_value(place_data, "description"),
-                "attributes_count": len(attributes_list),
-                "rating": user_provided_rating
-                or _safe_get_nested_value(place_data, "rating", 0.0),
-                "reviews_count": user_provided_reviews
-                or _safe_get_nested_value(place_data, "reviews", 0),
-                "social_links": social_links,
-                "recent_reviews": len(_filter_reviews_by_recency(all_reviews)),
-                "posts_count": recent_posts_count,
-                "photo_counts_by_uploader": _get_photo_counts(
-                    business_title, photo_attributions
-                ),
-                "total_photos_analyzed": len(photo_attributions),
-                "score": score,
-                "llm_analysis": llm_analysis,
-            }
+            llm_analysis = None
+            if include_llm_analysis:
+                llm_analysis = await get_llm_analysis(
+                    business_data=output, model_choice=config.GEMINI_MODEL_FLASH
+                )
+
+            final_output = {**output, "llm_analysis": llm_analysis}
 
             return {"success": True, "data": final_output}
 
@@ -405,9 +461,13 @@ class GBPAnalyzer:
             logging.error(
                 f"Critical error in analyze method: {e}\n{traceback.format_exc()}"
             )
-            return {"success": False, "error": f"Analysis failed: {str(e)}"}
+            return {
+                "success": False,
+                "error_code": ServiceError.INTERNAL,
+                "error": f"Analysis failed: {str(e)}",
+            }
 
-    def website_socials(
+    async def website_socials(
         self, query: Optional[str] = None, place_id: Optional[str] = None
     ) -> dict:
         """
@@ -421,55 +481,29 @@ class GBPAnalyzer:
         try:
             # --- Initial Search and Data Fetching (This part is correct) ---
             current_place_id = place_id
-            initial_search_result = None
+            place_data = None
 
             if not current_place_id:
                 if not query:
                     return {
                         "success": False,
+                        "error_code": ServiceError.INVALID_INPUT,
                         "error": "Internal Error: Either query or place_id must be provided.",  # noqa
                     }
 
-                search_params = {
-                    "engine": "google_maps",
-                    "q": query,
-                    "type": "search",
-                    "api_key": self.api_key,
-                }
-                initial_results = _safe_api_call(search_params, "initial search")
-                if not initial_results:
-                    return {
-                        "success": False,
-                        "error": f"No results found for query: '{query}'",
-                    }
-
-                initial_search_result = (
-                    initial_results.get("place_results")
-                    or (initial_results.get("local_results", [])[0:1] or [None])[0]
-                )
-                if not initial_search_result:
-                    return {
-                        "success": False,
-                        "error": f"No GBP found for query: '{query}'",
-                    }
+                resolved = await self._search_place(query)
+                if not resolved["success"]:
+                    return resolved
 
-                current_place_id = initial_search_result.get("place_id")
-                if not current_place_id:
-                    return {
-                        "success": False,
-                        "error": "Could not extract place_id from search results.",
-                    }
+                current_place_id = resolved["place_id"]
+                place_data = resolved["place_data"]
 
-            details_params = {
-                "engine": "google_maps",
-                "place_id": current_place_id,
-                "api_key": self.api_key,
-            }
-            details_results = _safe_api_call(details_params, "place details")
-            place_data = details_results.get("place_results", {})
+            if not place_data:
+                place_data = await self._fetch_place_details(current_place_id)
             if not place_data:
                 return {
                     "success": False,
+                    "error_code": ServiceError.UPSTREAM,
                     "error": f"Could not fetch detailed data for place_id: {current_place_id}",  # noqa
                 }
 
@@ -483,33 +517,17 @@ class GBPAnalyzer:
             }
             address = _safe_get_nested_value(place_data, "address")
 
-            # --- Concurrent Operations ---
             social_links = []
             try:
-                with ThreadPoolExecutor(max_workers=1) as api_executor:
-                    futures = {}
-                    try:
-                        # --- THE FIX IS HERE ---
-                        # We must pass the api_key to the helper function,
-                        # as it now requires it.
-                        futures["social"] = api_executor.submit(
-                            _get_social_links,
-                            place_data,
-                            business_title,
-                            address,
-                            self.api_key,
-                        )
-                    except Exception as e:
-                        logging.error(f"Error submitting social links task: {e}")
-
-                    if "social" in futures:
-                        try:
-                            social_links = futures["social"].result(timeout=30)
-                        except Exception as e:
-                            logging.error(f"Social links collection failed: {e}")
-                            social_links = []
+                social_links = await asyncio.wait_for(
+                    _get_social_links(
+                        place_data, business_title, address, self.api_key
+                    ),
+                    timeout=30,
+                )
             except Exception as e:
-                logging.error(f"Error during concurrent operations: {e}")
+                logging.error(f"Social links collection failed: {e}")
+                social_links = []
 
             result_data["social_links"] = social_links if social_links else []
 
@@ -520,6 +538,7 @@ class GBPAnalyzer:
             logging.error(f"Traceback: {traceback.format_exc()}")
             return {
                 "success": False,
+                "error_code": ServiceError.INTERNAL,
                 "error": f"Analysis failed: {str(e)}",
                 "data": default_result["data"],
             }
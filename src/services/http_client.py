@@ -0,0 +1,53 @@
+from typing import Optional
+
+import httpx
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+# Idle connections are kept open for a minute (httpx defaults to 5 seconds)
+# so analyses started a little apart still reuse warm TLS connections.
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=50, keepalive_expiry=60.0
+)
+
+# Connection failures (refused, reset, TLS errors) are retried on a fresh
+# connection before the request is reported as failed.
+HTTP_CONNECT_RETRIES = 3
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared async HTTP client, creating it on first use.
+
+    One client holds one connection pool, so every SerpApi call made by the
+    analyzer reuses the same keep-alive connections instead of paying for a
+    new TCP/TLS handshake per request. HTTP/2 lets concurrent calls share a
+    single connection. Requests whose connection can't be established are
+    retried up to HTTP_CONNECT_RETRIES times.
+
+    Returns:
+        httpx.AsyncClient: The process-wide HTTP client.
+    """
+    global _client
+
+    if _client is None or _client.is_closed:
+        transport = httpx.AsyncHTTPTransport(
+            http2=True, limits=HTTP_LIMITS, retries=HTTP_CONNECT_RETRIES
+        )
+        _client = httpx.AsyncClient(transport=transport, timeout=30.0)
+
+    return _client
+
+
+async def close_http_client() -> None:
+    """
+    Closes the shared HTTP client and releases its pooled connections.
+    """
+    global _client
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+
+    _client = None
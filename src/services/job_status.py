@@ -1,8 +1,10 @@
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from supabase import create_client, Client
 from supabase.client import ClientOptions
 from src.core.config import config
+from src.services.cache import cache_get, cache_set, redis_client
 
 url: str = config.SUPABASE_URL
 key: str = config.SUPABASE_KEY
@@ -15,10 +17,37 @@ options = ClientOptions(
 
 supabase: Client = create_client(url, key, options=options)
 
+JOB_STATUS_TTL = 24 * 60 * 60
 
-def check_job_status(job_id: str) -> Dict[str, Any]:
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+async def cache_job_status(job_id: str, status: str, place_id: Optional[str]) -> None:
+    """
+    Stores the current status of a job in the cache so that status polls
+    don't have to hit Supabase.
+
+    Args:
+        job_id (str): The job UUID
+        status (str): The current status of the job
+        place_id (Optional[str]): The place_id the job belongs to
     """
-    Check the status of a job by its UUID
+    # Job status is only cached in Redis: each server worker has its own
+    # in-process cache, which would keep serving a stale status.
+    if redis_client is None:
+        return
+
+    await cache_set(
+        _job_key(job_id), {"status": status, "place_id": place_id}, JOB_STATUS_TTL
+    )
+
+
+async def check_job_status(job_id: str) -> Dict[str, Any]:
+    """
+    Check the status of a job by its UUID.
+    The status is read from Redis when configured and falls back to Supabase.
 
     Args:
         job_id (str): The job UUID to check
@@ -30,25 +59,34 @@ def check_job_status(job_id: str) -> Dict[str, Any]:
     logging.info(f"Checking status for job: {job_id}")
 
     try:
-        job_result = supabase.table("jobs").select("*").eq("id", job_id).execute()
+        job = await cache_get(_job_key(job_id)) if redis_client is not None else None
+
+        if job is None:
+            job_result = await asyncio.to_thread(
+                supabase.table("jobs").select("*").eq("id", job_id).execute
+            )
+
+            if not job_result.data or len(job_result.data) == 0:
+                logging.warning(f"Job {job_id} not found")
 
-        if not job_result.data or len(job_result.data) == 0:
-            logging.warning(f"Job {job_id} not found")
+                return {"status": "not_found", "job_id": job_id, "place_id": ""}
 
-            return {"status": "not_found", "job_id": job_id, "place_id": ""}
+            job = job_result.data[0]
+            await cache_job_status(
+                job_id, job.get("status", "Pending"), job.get("place_id")
+            )
 
-        job = job_result.data[0]
         place_id = job.get("place_id")
         current_status = job.get("status", "Pending")
 
         business_data = None
         if current_status == "Analysis Finished" and place_id:
             try:
-                data_result = (
+                data_result = await asyncio.to_thread(
                     supabase.table("GBP-results")
                     .select("*")
                     .eq("place_id", place_id)
-                    .execute()
+                    .execute
                 )
 
                 if data_result.data and len(data_result.data) > 0:
@@ -73,9 +111,9 @@ def check_job_status(job_id: str) -> Dict[str, Any]:
         return {"status": "Analysis Failed", "job_id": job_id, "place_id": ""}
 
 
-def update_job_status(job_id: str, status: str) -> bool:
+async def update_job_status(job_id: str, status: str) -> bool:
     """
-    Update the status of a job
+    Update the status of a job in Supabase and in the status cache
 
     Args:
         job_id (str): The job UUID to update
@@ -85,12 +123,13 @@ def update_job_status(job_id: str, status: str) -> bool:
         bool: True if successful, False otherwise
     """
     try:
-        result = (
-            supabase.table("jobs").update({"status": status}).eq("id", job_id).execute()
+        result = await asyncio.to_thread(
+            supabase.table("jobs").update({"status": status}).eq("id", job_id).execute
         )
 
         if result.data and len(result.data) > 0:
             logging.info(f"Update job {job_id} status to {status}")
+            await cache_job_status(job_id, status, result.data[0].get("place_id"))
 
             return True
         else:
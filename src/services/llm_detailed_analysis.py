@@ -1,59 +1,187 @@
+import hashlib
 import logging
-import json
+from typing import AsyncIterator
+
 import google.generativeai as genai
+import orjson
 
 from src.core.config import config
 from src.api.v1.schemas.analyzer_schemas import ModelChoice
+from src.services.cache import cache_get, cache_set
+from src.services.errors import ServiceError
+
+# Top-level keys that change between otherwise identical analyses (row ids,
+# job bookkeeping, timestamps). Everything else in `business_data` is part of
+# the cache key.
+CACHE_KEY_VOLATILE_FIELDS = frozenset(
+    {
+        "id",
+        "job_id",
+        "created_at",
+        "updated_at",
+    }
+)
+
+MODEL_INIT_ERROR = "LLM analysis is currently unavailable (could not initialize model)."
+API_ERROR = "Failed to generate detailed analysis due to an API error."
+EMPTY_RESPONSE_ERROR = "The model returned no analysis for this business."
+
+
+class LLMStreamError(Exception):
+    """
+    Raised by `stream_llm_analysis` when the stream cannot be completed. Text
+    already yielded is partial, so callers should report the failure rather
+    than treat it as the end of the analysis.
+    """
+
+    def __init__(self, error_code: ServiceError, message: str):
+        super().__init__(message)
+        self.error_code = error_code
+        self.message = message
+
+
+try:
+    genai.configure(api_key=config.GEMINI_API_KEY)
+except Exception as e:
+    logging.error(f"Error configuring Generative AI: {e}")
 
 
-def load_pre_prompt():
+async def get_llm_analysis(business_data: dict, model_choice: ModelChoice) -> str:
+    """
+    Takes structured data, sends it to the chosen Google Gemini model using a
+    file-based prompt template, and returns a detailed analysis.
+
+    Results are cached on `business_data` minus its volatile bookkeeping
+    fields, so repeat analyses of an unchanged profile skip Gemini entirely.
     """
-    Loads the pre-defined prompt text from a file specified in the configuration.
 
-    The prompt is used for initializing the language model with context or instructions
-    before performing detailed analysis.
+    cache_key = _cache_key(business_data, model_choice)
+    cached = await cache_get(cache_key)
+    if cached:
+        logging.info(f"Serving cached LLM analysis for {business_data.get('title')}")
+        return cached
+
+    analysis = await _generate_analysis(business_data, model_choice)
+
+    if analysis not in (MODEL_INIT_ERROR, API_ERROR):
+        await cache_set(cache_key, analysis, config.LLM_CACHE_TTL)
 
-    Returns:
-        str: The content of the pre-prompt file as a string.
+    return analysis
+
+
+async def stream_llm_analysis(
+    business_data: dict, model_choice: ModelChoice
+) -> AsyncIterator[str]:
+    """
+    Streams the detailed analysis from Gemini as it is generated.
+
+    A cached analysis is yielded as a single chunk. A completed stream is
+    cached under the same key as `get_llm_analysis`, so both paths share
+    results.
+
+    Yields:
+        str: The next chunk of analysis text.
 
     Raises:
-        FileNotFoundError: If the pre-prompt file cannot be found at the specified path.
-        IOError: If there is an error reading the pre-prompt file.
+        LLMStreamError: If the model can't be initialized, the API call fails
+            or the model returns no text.
     """
 
-    prompt_path = config.GBP_ANALYSIS_PROMPT_PATH
+    cache_key = _cache_key(business_data, model_choice)
+    cached = await cache_get(cache_key)
+    if cached:
+        logging.info(f"Serving cached LLM analysis for {business_data.get('title')}")
+        yield cached
+        return
+
+    selected_model_name = _select_model_name(model_choice)
+
+    logging.info(f"Streaming from Gemini model: {selected_model_name}")
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as file:
-            return file.read()
-    except FileNotFoundError:
-        logging.error(
-            f"CRITICAL: Prompt template file not found at path: '{prompt_path}'"
-        )
-        return "Please provide a professional analysis of the following business data: {business_data_json}"  # noqa
+        model = genai.GenerativeModel(selected_model_name)
     except Exception as e:
-        logging.error(f"Error loading prompt template from '{prompt_path}': {e}")
-        return "Error loading prompt."
+        logging.error(f"Could not initialize Gemini model '{selected_model_name}': {e}")
+        raise LLMStreamError(ServiceError.INTERNAL, MODEL_INIT_ERROR) from e
+
+    chunks = []
 
+    try:
+        response = await model.generate_content_async(
+            _build_prompt(business_data), stream=True
+        )
+        async for chunk in response:
+            text = _chunk_text(chunk)
+            if text:
+                chunks.append(text)
+                yield text
+    except Exception as e:
+        logging.error(
+            f"Error streaming from Google Gemini API with model {selected_model_name}: {e}"  # noqa
+        )
+        raise LLMStreamError(ServiceError.UPSTREAM, API_ERROR) from e
 
-PROMPT_TEMPLATE = load_pre_prompt()
+    if not chunks:
+        logging.error(f"Gemini model {selected_model_name} streamed no text")
+        raise LLMStreamError(ServiceError.UPSTREAM, EMPTY_RESPONSE_ERROR)
 
-try:
-    genai.configure(api_key=config.GEMINI_API_KEY)
-except Exception as e:
-    logging.error(f"Error configuring Generative AI: {e}")
+    await cache_set(cache_key, "".join(chunks).strip(), config.LLM_CACHE_TTL)
 
 
-def get_llm_analysis(business_data: dict, model_choice: ModelChoice) -> str:
+def _chunk_text(chunk) -> str:
     """
-    Takes structured data, sends it to the chosen Google Gemini model using a
-    file-based prompt template, and returns a detailed analysis.
+    Returns the text of a streamed chunk, or "" for chunks without any, e.g.
+    ones cut short by a safety block, where `chunk.text` raises ValueError.
     """
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
 
+def _select_model_name(model_choice: ModelChoice) -> str:
     if model_choice == ModelChoice.PRO:
-        selected_model_name = config.GEMINI_MODEL_PRO
-    else:
-        selected_model_name = config.GEMINI_MODEL_FLASH
+        return config.GEMINI_MODEL_PRO
+
+    return config.GEMINI_MODEL_FLASH
+
+
+def _cache_key(business_data: dict, model_choice: ModelChoice) -> str:
+    """
+    Hashes `business_data`, minus CACHE_KEY_VOLATILE_FIELDS, together with the
+    selected model into a stable cache key.
+    """
+    relevant = {
+        key: value
+        for key, value in business_data.items()
+        if key not in CACHE_KEY_VOLATILE_FIELDS
+    }
+    payload = orjson.dumps(
+        [_select_model_name(model_choice), relevant],
+        option=orjson.OPT_SORT_KEYS,
+        default=str,
+    )
+    digest = hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+    return f"llm:{digest}"
+
+
+def _build_prompt(business_data: dict) -> str:
+    business_data_as_json_string = orjson.dumps(
+        business_data, option=orjson.OPT_INDENT_2, default=str
+    ).decode("utf-8")
+
+    return config.gbp_analysis_prompt.format(
+        business_data_json=business_data_as_json_string,
+    )
+
+
+async def _generate_analysis(business_data: dict, model_choice: ModelChoice) -> str:
+    """
+    Sends a single prompt to the chosen Gemini model and returns its text.
+    """
+
+    selected_model_name = _select_model_name(model_choice)
 
     logging.info(f"Using Gemini model: {selected_model_name}")
 
@@ -61,19 +189,13 @@ def get_llm_analysis(business_data: dict, model_choice: ModelChoice) -> str:
         model = genai.GenerativeModel(selected_model_name)
     except Exception as e:
         logging.error(f"Could not initialize Gemini model '{selected_model_name}': {e}")
-        return "LLM analysis is currently unavailable (could not initialize model)."
-
-    business_data_as_json_string = json.dumps(business_data, indent=2)
-
-    final_prompt = PROMPT_TEMPLATE.format(
-        business_data_json=business_data_as_json_string,
-    )
+        return MODEL_INIT_ERROR
 
     try:
-        response = model.generate_content(final_prompt)
+        response = await model.generate_content_async(_build_prompt(business_data))
         return response.text.strip()
     except Exception as e:
         logging.error(
             f"Error calling Google Gemini API with model {selected_model_name}: {e}"
         )
-        return "Failed to generate detailed analysis due to an API error."
+        return API_ERROR
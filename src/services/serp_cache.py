@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+from functools import partial
+from typing import Dict, Optional
+
+import orjson
+
+from src.services.cache import cache_get, cache_set
+from src.services.http_client import SERPAPI_URL, get_http_client
+
+# How long SerpApi responses stay fresh, per engine. Place details change
+# rarely; reviews are read newest-first and go stale quickly.
+SERP_CACHE_TTLS = {
+    "google_maps": 24 * 60 * 60,
+    "google": 24 * 60 * 60,
+    "google_maps_photos": 6 * 60 * 60,
+    "google_maps_posts": 6 * 60 * 60,
+    "google_maps_reviews": 60 * 60,
+}
+DEFAULT_SERP_CACHE_TTL = 60 * 60
+
+# Cache misses currently being fetched, keyed like the cache.
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _serp_cache_key(params: dict) -> str:
+    """
+    Hashes the search parameters, minus the API key, into a cache key.
+    """
+    relevant = {key: value for key, value in params.items() if key != "api_key"}
+    payload = orjson.dumps(relevant, option=orjson.OPT_SORT_KEYS, default=str)
+    digest = hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+    return f"serp:{digest}"
+
+
+async def serp_get(
+    params: dict, ttl: Optional[int] = None, no_cache: bool = False
+) -> dict:
+    """
+    Runs a SerpApi search, serving repeated searches from the cache.
+
+    Identical searches that miss the cache at the same time (e.g. the same
+    business analyzed twice in a batch, or a job and a website_socials call
+    resolving the same place) share a single SerpApi request.
+
+    Args:
+        params (dict): The SerpApi search parameters, including `api_key`.
+        ttl (Optional[int]): Seconds to cache the response for. Defaults to
+            the per-engine TTL in SERP_CACHE_TTLS.
+        no_cache (bool): Skip the cache lookup and always call SerpApi. The
+            fresh response still replaces the cached one.
+
+    Returns:
+        dict: The decoded SerpApi response. Error responses are returned
+        as-is but never cached.
+    """
+    cache_key = _serp_cache_key(params)
+    if not no_cache:
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+    task = _inflight.get(cache_key)
+    if task is None:
+        # Callers such as the paginator update `params` in place, so the
+        # request works from a snapshot.
+        task = asyncio.create_task(_fetch(dict(params), cache_key, ttl))
+        _inflight[cache_key] = task
+        task.add_done_callback(partial(_forget_inflight, cache_key))
+
+    # Shielded so that one cancelled caller doesn't cancel the shared request.
+    return await asyncio.shield(task)
+
+
+def _forget_inflight(cache_key: str, task: asyncio.Task) -> None:
+    _inflight.pop(cache_key, None)
+
+    # Every waiter may have been cancelled; mark the outcome as retrieved so
+    # an abandoned request doesn't log "exception was never retrieved".
+    if not task.cancelled():
+        task.exception()
+
+
+async def _fetch(params: dict, cache_key: str, ttl: Optional[int]) -> dict:
+    response = await get_http_client().get(SERPAPI_URL, params=params)
+    results = orjson.loads(response.content)
+
+    if "error" not in results:
+        if ttl is None:
+            ttl = SERP_CACHE_TTLS.get(params.get("engine"), DEFAULT_SERP_CACHE_TTL)
+        await cache_set(cache_key, results, ttl)
+        await _seed_place_details(params, results, ttl)
+
+    return results
+
+
+async def _seed_place_details(params: dict, results: dict, ttl: int) -> None:
+    """
+    Caches the place details carried by an exact-match Maps search under the
+    key of the equivalent place_id lookup.
+
+    A search that resolves to a single business already returns its full
+    `place_results`, so a later details lookup for that place_id (e.g. the
+    background job started after `create_analysis_job` resolved the ID) is
+    answered from the cache instead of a second billed SerpApi call.
+    """
+    if params.get("engine") != "google_maps" or params.get("type") != "search":
+        return
+
+    place_results = results.get("place_results")
+    if not isinstance(place_results, dict) or not place_results.get("place_id"):
+        return
+
+    details_params = {"engine": "google_maps", "place_id": place_results["place_id"]}
+    await cache_set(
+        _serp_cache_key(details_params), {"place_results": place_results}, ttl
+    )
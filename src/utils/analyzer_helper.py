@@ -1,224 +1,342 @@
+import asyncio
 import logging
-from typing import List, Dict
-from concurrent.futures import (
-    ProcessPoolExecutor,
-    TimeoutError as FutureTimeoutError,
-)
-from serpapi import GoogleSearch
-
-from src.scrapers.uploader_scraper_process import run_photo_scraper_process
+from collections import Counter
+from typing import AsyncIterator, Callable, List, Dict, Optional
+from src.scrapers.photo_scraper import PhotoScraper
+from src.services.cache import normalize_query
+from src.services.serp_cache import serp_get
 from src.utils.parsing import convert_relative_date_to_days
 
+logger = logging.getLogger(__name__)
+
 pagination_page_limit = 1
-# pagination_item_limit = 200
+pagination_item_limit = 200
+
+# Uploader labels that always mean the photo came from the business owner.
+OWNER_UPLOADER_LABELS = frozenset({"owner", "by owner"})
+
+# SerpApi page tokens are chained, so follow-up pages can't be requested
+# ahead of time. Engines that accept a larger `num` on follow-up pages are
+# asked for full pages instead, which cuts the number of round trips.
+FOLLOW_UP_PAGE_SIZE = {"google_maps_reviews": 20}
+
+# Relative review dates that fall within the last month.
+RECENT_REVIEW_DATES = frozenset(
+    {
+        "now",
+        "today",
+        "a week ago",
+        "2 weeks ago",
+        "3 weeks ago",
+        "4 weeks ago",
+        "a month ago",
+    }
+)
+
+# The scraper holds no per-run state, so every analysis shares one instance.
+_photo_scraper = PhotoScraper()
+
+# In-flight Knowledge Graph lookups, keyed by normalized query.
+_kg_socials_inflight: Dict[str, asyncio.Task] = {}
+
 
+def _set_next_page(params: dict, next_page_token: str, remaining: int) -> None:
+    """
+    Points `params` at the next page of results, asking for no more than the
+    `remaining` items still needed when the engine supports a page size.
+    """
+    params["next_page_token"] = next_page_token
+
+    page_size = FOLLOW_UP_PAGE_SIZE.get(params.get("engine"))
+    if page_size:
+        params["num"] = min(page_size, remaining)
 
-def _safe_api_call(params: dict, description: str) -> dict:
+
+async def _safe_api_call(params: dict, description: str) -> dict:
     """
     Safely make API calls with error handling and logging.
     """
     try:
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = await serp_get(params)
 
         if "error" in results:
-            logging.error(f"API Error for {description}: {results['error']}")
+            logger.error("API Error for %s: %s", description, results["error"])
             return {}
 
         return results
     except Exception as e:
-        logging.error(f"Exception during {description}: {e}")
+        logger.error("Exception during %s: %s", description, e)
         return {}
 
 
-def _paginate_results(params: dict, results_key: str) -> list:
+def _first_search_result(search_results: dict) -> Optional[dict]:
     """
-    Enhanced pagination with better error handling.
+    Returns the business a google_maps search resolved to: the exact match in
+    `place_results` when there is one, otherwise the first local result.
     """
-    all_results = []
+    local_results = search_results.get("local_results") or [None]
+    return search_results.get("place_results") or local_results[0]
+
+
+async def _iter_paginated(
+    params: dict,
+    results_key: str,
+    page_limit: int = pagination_page_limit,
+    item_limit: int = pagination_item_limit,
+    stop_when: Optional[Callable[[list], bool]] = None,
+) -> AsyncIterator[list]:
+    """
+    Follows SerpApi pagination until the results run out or a limit is hit,
+    yielding each page's items as soon as it arrives. The next page is
+    already being fetched while the caller processes the current one.
+
+    Args:
+        params (dict): The SerpApi request parameters; updated in place with
+            the next page token as pagination advances.
+        results_key (str): The response key holding the page items.
+        page_limit (int): The maximum number of pages to request.
+        item_limit (int): The maximum number of items to yield; a final page
+            that crosses it is truncated.
+        stop_when (Optional[Callable[[list], bool]]): Called with each page's
+            items; returning True stops before the next page is requested.
+
+    Yields:
+        list: The items of one page.
+    """
+    # Ask SerpApi to return only the sections read below; place info, search
+    # metadata and other top-level blocks are then never downloaded or parsed.
+    params.setdefault("json_restrictor", f"{results_key}, serpapi_pagination")
+
+    engine = params.get("engine")
+
+    async def fetch_page(page_number: int) -> dict:
+        return await _safe_api_call(params, f"{engine} page {page_number}")
+
+    item_count = 0
     page_count = 0
+    next_page: Optional[asyncio.Task] = asyncio.create_task(fetch_page(1))
 
-    while True:
-        page_count += 1
-        if page_count > pagination_page_limit:
-            logging.warning(
-                f"Reached page limit of {pagination_page_limit} for {params.get('engine')}"  # noqa
+    try:
+        while next_page is not None:
+            results = await next_page
+            next_page = None
+            page_count += 1
+
+            page_items = results.get(results_key)
+            if not page_items:
+                break
+
+            # Drop the overshoot of a final page that crosses item_limit.
+            remaining = item_limit - item_count
+            if len(page_items) > remaining:
+                page_items = page_items[:remaining]
+
+            item_count += len(page_items)
+            logger.info(
+                "Retrieved %d items from page %d for %s. Total: %d",
+                len(page_items),
+                page_count,
+                engine,
+                item_count,
             )
-            break
 
-            # Use safe API call
-        results = _safe_api_call(params, f"{params.get('engine')} page {page_count}")
-        if not results:
-            break
+            pagination = results.get("serpapi_pagination")
+            next_page_token = pagination.get("next_page_token") if pagination else None
+            del results, pagination
 
-        page_items = results.get(results_key, [])
-        if not page_items:
-            break
+            wants_more = (
+                next_page_token
+                and item_count < item_limit
+                and not (stop_when is not None and stop_when(page_items))
+            )
+            if wants_more and page_count >= page_limit:
+                logger.warning("Reached page limit of %d for %s", page_limit, engine)
+            elif wants_more:
+                # Request the next page before handing this one to the caller,
+                # so the round trip overlaps with the caller's processing.
+                _set_next_page(params, next_page_token, item_limit - item_count)
+                next_page = asyncio.create_task(fetch_page(page_count + 1))
 
-        all_results.extend(page_items)
-        logging.info(
-            f"Retrieved {len(page_items)} items from page {page_count} for {params.get('engine')}"  # noqa
-        )
+            yield page_items
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+async def _paginate_results(params: dict, results_key: str, **limits) -> list:
+    """
+    Collects every page from `_iter_paginated` into one list. Accepts the same
+    `page_limit`, `item_limit` and `stop_when` keyword arguments.
+    """
+    all_results = []
 
-        pagination = results.get("serpapi_pagination", {})
-        if "next_page_token" in pagination:
-            params["next_page_token"] = pagination["next_page_token"]
-        else:
-            break
+    async for page_items in _iter_paginated(params, results_key, **limits):
+        all_results.extend(page_items)
 
     return all_results
 
 
-def _filter_reviews_by_recency(all_reviews: List[Dict]) -> List[Dict]:
+def _is_recent_review(date_string: str) -> bool:
     """
-    Enhanced review filtering with better error handling.
+    Returns True if a lowercase relative review date is within the last month.
     """
-    if not all_reviews:
-        logging.info("No reviews to filter")
-        return []
+    return date_string in RECENT_REVIEW_DATES or "day" in date_string
 
-    logging.info(
-        f"Filtering {len(all_reviews)} reviews to find those from the last month..."
-    )
-    recent_reviews = []
 
-    VALID_MONTH_STRINGS = {
-        "now",
-        "today",
-        "a week ago",
-        "2 weeks ago",
-        "3 weeks ago",
-        "4 weeks ago",
-        "a month ago",
-    }
-
-    for review in all_reviews:
-        try:
-            date_string = review.get("date", "").lower()
-            if not date_string:
-                continue
-            if date_string in VALID_MONTH_STRINGS or "day" in date_string:
-                recent_reviews.append(review)
-        except Exception as e:
-            logging.warning(f"Error processing review date: {e}")
-            continue
+def _reached_older_reviews(page_items: list) -> bool:
+    """
+    Pagination stop condition for reviews fetched with `sort_by=newestFirst`.
 
-    logging.info(f"Found {len(recent_reviews)} recent reviews.")
-    return recent_reviews
+    Only last-month reviews are counted, so once a page ends with an older
+    review every later page is older still and isn't worth fetching.
+    """
+    last_review = page_items[-1]
+    date_string = (
+        str(last_review.get("date") or "").lower()
+        if isinstance(last_review, dict)
+        else ""
+    )
+    return bool(date_string) and not _is_recent_review(date_string)
 
 
-def _fetch_all_posts(data_id: str, business_title: str, api_key: str) -> list:
+async def _count_recent_posts(data_id: str, business_title: str, api_key: str) -> int:
     """
-    Enhanced posts fetching with better error handling.
+    Counts the posts published within the last month (approximated as 31 days).
+
+    Pages are consumed as they arrive and only the running count is kept, so
+    the full list of posts is never built.
     """
     if not data_id:
-        logging.warning("No data_id provided for posts fetching")
-        return []
+        logger.warning("No data_id provided for posts fetching")
+        return 0
 
     if not business_title:
-        logging.warning("No business_title provided for posts fetching")
-        return []
+        logger.warning("No business_title provided for posts fetching")
+        return 0
 
-    try:
-        params = {
-            "engine": "google_maps_posts",
-            "q": business_title,
-            "data_id": data_id,
-            "api_key": api_key,
-        }
+    params = {
+        "engine": "google_maps_posts",
+        "q": business_title,
+        "data_id": data_id,
+        "api_key": api_key,
+    }
+    recent_count = 0
 
-        return _paginate_results(params, "posts")
+    try:
+        async for page_items in _iter_paginated(params, "posts"):
+            recent_count += sum(
+                1
+                for post in page_items
+                if isinstance(post, dict)
+                and post.get("posted_at_text")
+                and convert_relative_date_to_days(post["posted_at_text"]) <= 31
+            )
     except Exception as e:
-        logging.error(f"Error fetching posts: {e}")
-        return []
+        logger.error("Error fetching posts: %s", e)
+
+    logger.info("Found %d posts from the last month.", recent_count)
+    return recent_count
 
 
-def _filter_posts_by_recency(all_posts: List[Dict]) -> int:
+async def _kg_socials(query: str, api_key: str) -> list:
     """
-    Filters a list of posts and returns the count of those
-    posted within the last month (approximated as 31 days).
+    Looks up the social profiles listed in the Google Knowledge Panel for a query.
     """
-    if not all_posts:
-        return 0
+    params = {
+        "engine": "google",
+        "q": query,
+        "api_key": api_key,
+    }
+
+    results = await _safe_api_call(params, "knowledge graph social links")
+    profiles = results.get("knowledge_graph", {}).get("profiles", [])
 
-    recent_post_count = 0
-    for post in all_posts:
-        date_str = post.get("posted_at_text")
-        if not date_str:
-            continue
+    return [
+        {"name": profile["name"], "link": profile["link"]}
+        for profile in profiles
+        if isinstance(profile, dict) and profile.get("name") and profile.get("link")
+    ]
 
-        days_ago = convert_relative_date_to_days(date_str)
-        if days_ago <= 31:
-            recent_post_count += 1
 
-    logging.info(f"Found {recent_post_count} posts from the last month.")
-    return recent_post_count
+async def _kg_socials_cached(query: str, api_key: str) -> list:
+    """
+    Memoized `_kg_socials`: concurrent lookups for the same query share one
+    in-flight SerpApi call, and completed lookups are answered by the SerpApi
+    response cache (Redis when configured) without touching the network.
+    """
+    key = normalize_query(query)
+
+    task = _kg_socials_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_kg_socials(query, api_key))
+        _kg_socials_inflight[key] = task
+        task.add_done_callback(lambda _: _kg_socials_inflight.pop(key, None))
 
+    # Shielded so that one cancelled caller doesn't cancel the shared lookup.
+    return list(await asyncio.shield(task))
 
-def _fetch_knowledge_graph_socials(
+
+async def _fetch_knowledge_graph_socials(
     business_title: str, address: str, api_key: str
 ) -> list:
     """
     Enhanced social media fetching with better error handling.
     """
     if not business_title or not address:
-        logging.warning("No query provided for social media fetching")
+        logger.warning("No query provided for social media fetching")
         return []
 
     query = f"{business_title}, {address}"
-    logging.info(f"Fetching social links with specific query: '{query}'")
+    logger.info("Fetching social links with specific query: '%s'", query)
 
     try:
-        params = {
-            "engine": "google",
-            "q": query,
-            "api_key": api_key,
-        }
-
-        results = _safe_api_call(params, "knowledge graph social links")
-        if not results:
-            return []
-
-        knowledge_graph = results.get("knowledge_graph", {})
-        profiles = knowledge_graph.get("profiles", [])
-
-        social_links = []
-        for profile in profiles:
-            try:
-                name = profile.get("name")
-                link = profile.get("link")
-                if name and link:
-                    social_links.append({"name": name, "link": link})
-            except Exception as e:
-                logging.warning(f"Error processing social profile: {e}")
-                continue
-
-        return social_links
+        return await _kg_socials_cached(query, api_key)
     except Exception as e:
-        logging.error(f"Error fetching social links: {e}")
+        logger.error("Error fetching social links: %s", e)
         return []
 
 
-def _fetch_all_reviews(place_id: str, api_key: str) -> list:
+async def _count_recent_reviews(place_id: str, api_key: str) -> int:
     """
-    Enhanced review fetching with better error handling.
+    Counts the reviews posted within the last month.
+
+    Pages are consumed as they arrive and only the running count is kept, so
+    review text is never held beyond the page being counted.
     """
     if not place_id:
-        logging.warning("No place_id provided for reviews fetching")
-        return []
+        logger.warning("No place_id provided for reviews fetching")
+        return 0
 
-    try:
-        params = {
-            "engine": "google_maps_reviews",
-            "place_id": place_id,
-            "api_key": api_key,
-            "sort_by": "newestFirst",
-        }
+    params = {
+        "engine": "google_maps_reviews",
+        "place_id": place_id,
+        "api_key": api_key,
+        "sort_by": "newestFirst",
+    }
+    recent_count = 0
 
-        return _paginate_results(params, "reviews")
+    try:
+        async for page_items in _iter_paginated(
+            params, "reviews", stop_when=_reached_older_reviews
+        ):
+            recent_count += sum(
+                1
+                for review in page_items
+                if isinstance(review, dict)
+                and _is_recent_review(str(review.get("date") or "").lower())
+            )
     except Exception as e:
-        logging.error(f"Error fetching reviews: {e}")
-        return []
+        logger.error("Error fetching reviews: %s", e)
+
+    logger.info("Found %d recent reviews.", recent_count)
+    return recent_count
+
+
+def _is_owner_uploader(uploader: str, clean_business_title: str) -> bool:
+    """
+    Returns True if a normalized uploader name belongs to the business owner.
+    """
+    return uploader in OWNER_UPLOADER_LABELS or clean_business_title in uploader
 
 
 def _get_photo_counts(business_title: str, photo_attributions: List[Dict]) -> dict:
@@ -228,30 +346,35 @@ def _get_photo_counts(business_title: str, photo_attributions: List[Dict]) -> di
     default_counts = {"owner_photo_count": 0, "customer_photo_count": 0}
 
     if not photo_attributions:
-        logging.info("No photo attributions provided")
+        logger.info("No photo attributions provided")
         return default_counts
 
     if not business_title:
-        logging.warning("No business title provided for photo counting")
+        logger.warning("No business title provided for photo counting")
         return default_counts
 
     try:
-        owner_count, customer_count = 0, 0
-        clean_business_title = business_title.lower().strip()
-
-        for photo in photo_attributions:
-            try:
-                uploader_name = photo.get("uploader", "Unknown").lower().strip()
-                if uploader_name == "owner" or clean_business_title in uploader_name:
-                    owner_count += 1
-                else:
-                    customer_count += 1
-            except Exception as e:
-                logging.warning(f"Error processing photo attribution: {e}")
-                customer_count += 1  # Default to customer if unclear
-
-        logging.info(
-            f"Final Tally (from Playwright): Owner: {owner_count}, Customer: {customer_count}"  # noqa
+        clean_business_title = business_title.casefold().strip()
+
+        # The scraper labels photos with a handful of repeated uploader
+        # values, so each distinct one is normalized and compared once rather
+        # than once per photo. Malformed attributions count as customer photos.
+        uploader_counts = Counter(
+            str(photo.get("uploader", "Unknown"))
+            for photo in photo_attributions
+            if isinstance(photo, dict)
+        )
+        owner_count = sum(
+            count
+            for uploader, count in uploader_counts.items()
+            if _is_owner_uploader(uploader.casefold().strip(), clean_business_title)
+        )
+        customer_count = len(photo_attributions) - owner_count
+
+        logger.info(
+            "Final Tally (from Playwright): Owner: %d, Customer: %d",
+            owner_count,
+            customer_count,
         )
 
         return {
@@ -259,44 +382,39 @@ def _get_photo_counts(business_title: str, photo_attributions: List[Dict]) -> di
             "customer_photo_count": customer_count,
         }
     except Exception as e:
-        logging.error(f"Error calculating photo counts: {e}")
+        logger.error("Error calculating photo counts: %s", e)
         return default_counts
 
 
-def _run_photo_scraper(place_id: str, business_title: str) -> list:
+async def _run_photo_scraper(place_id: str, business_title: str) -> list:
     """
     Enhanced photo scraper with better error handling and timeout management.
     """
     if not place_id or not business_title:
-        logging.warning("Missing search_url or business_title for photo scraping")
+        logger.warning("Missing search_url or business_title for photo scraping")
         return []
 
     try:
-        with ProcessPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(
-                run_photo_scraper_process, place_id, business_title
-            )
-            try:
-                result = future.result(timeout=300)  # 5 minute timeout
-                return result if result else []
-            except FutureTimeoutError:
-                logging.error("Photo scraping process timed out after 5 minutes")
-                return []
-            except Exception as e:
-                logging.error(f"Photo scraping process failed: {e}")
-                return []
+        result = await asyncio.wait_for(
+            _photo_scraper.get_attributions_by_navigation(place_id, business_title),
+            timeout=300,  # 5 minute timeout
+        )
+        return result if result else []
+    except asyncio.TimeoutError:
+        logger.error("Photo scraping timed out after 5 minutes")
+        return []
     except Exception as e:
-        logging.error(f"Error setting up photo scraper: {e}")
+        logger.error("Photo scraping failed: %s", e)
         return []
 
 
-def _get_social_links(
+async def _get_social_links(
     place_data: dict, business_title: str, address: str, api_key: str
 ) -> list:
 
     links = place_data.get("links", []) if place_data else []
     if not links and business_title and address:
-        links = _fetch_knowledge_graph_socials(business_title, address, api_key)
+        links = await _fetch_knowledge_graph_socials(business_title, address, api_key)
     return links
 
 
@@ -1,3 +1,5 @@
+import logging
+
 from src.utils.scoring import (
     _star_rating_scoring,
     _fields_filled_scoring,
@@ -36,13 +38,13 @@ def calculate_score(business_data: dict) -> float:
     review_recency_score = _review_recency_scoring(review_recency)
     total_image_score = (owner_score + customer_score) / 2
 
-    print("completeness_score: ", completeness_score)
-    print("NAPW_score: ", NAPW_score)
-    print("google_post_score: ", google_post_score)
-    print("owner_score: ", owner_score)
-    print("customer_score: ", customer_score)
-    print("review_recency_score: ", review_recency_score)
-    print("total_image_score: ", total_image_score)
+    logging.debug("completeness_score: %s", completeness_score)
+    logging.debug("NAPW_score: %s", NAPW_score)
+    logging.debug("google_post_score: %s", google_post_score)
+    logging.debug("owner_score: %s", owner_score)
+    logging.debug("customer_score: %s", customer_score)
+    logging.debug("review_recency_score: %s", review_recency_score)
+    logging.debug("total_image_score: %s", total_image_score)
 
     # Your weighting logic remains the same
     weighted_google_post_score = google_post_score * 0.20
@@ -53,13 +55,13 @@ def calculate_score(business_data: dict) -> float:
     weighted_fields_score = completeness_score * 0.05
     weighted_napw_score = NAPW_score * 0.05
 
-    print("weighted_google_post_score: ", weighted_google_post_score)
-    print("weighted_image_score: ", weighted_image_score)
-    print("weighted_review_recency_score: ", weighted_review_recency_score)
-    print("weighted_star_score: ", weighted_star_score)
-    print("weighted_review_score: ", weighted_review_score)
-    print("weighted_fields_score: ", weighted_fields_score)
-    print("weighted_napw_score: ", weighted_napw_score)
+    logging.debug("weighted_google_post_score: %s", weighted_google_post_score)
+    logging.debug("weighted_image_score: %s", weighted_image_score)
+    logging.debug("weighted_review_recency_score: %s", weighted_review_recency_score)
+    logging.debug("weighted_star_score: %s", weighted_star_score)
+    logging.debug("weighted_review_score: %s", weighted_review_score)
+    logging.debug("weighted_fields_score: %s", weighted_fields_score)
+    logging.debug("weighted_napw_score: %s", weighted_napw_score)
 
     business_score = (
         weighted_google_post_score
@@ -73,6 +75,6 @@ def calculate_score(business_data: dict) -> float:
 
     safe_score = round(business_score, 1)
 
-    print("safe_score: ", safe_score)
+    logging.debug("safe_score: %s", safe_score)
 
     return safe_score
@@ -1,3 +1,18 @@
+import re
+from functools import lru_cache
+
+# The leading count and unit of a relative date such as "3 weeks ago" or
+# "a month ago". "a"/"an", optionally followed by "few" or "couple (of)" as in
+# "a few days ago", leave the count group empty and count as one.
+RELATIVE_DATE_PATTERN = re.compile(
+    r"\s*(?:(\d+)|an?(?:\s+(?:few|couple(?:\s+of)?))?)"
+    r"\s+(day|week|month|year|hour)",
+    re.IGNORECASE,
+)
+
+DAYS_PER_UNIT = {"day": 1, "week": 7, "month": 30, "year": 365, "hour": 1 / 24}
+
+
 def convert_relative_date_to_days(date_str):
     """
     Converts a relative date string (e.g., "a week ago") into an estimated
@@ -6,33 +21,23 @@ def convert_relative_date_to_days(date_str):
     if not isinstance(date_str, str):
         return float("inf")
 
-    date_str = date_str.lower()
-    num = 0
+    return _relative_date_to_days(date_str)
 
-    if "now" in date_str or "moment" in date_str:
-        return 0
 
-    parts = date_str.split()
-    if parts[0] in ["a", "an"]:
-        num = 1
-    else:
-        try:
-            num = int(parts[0])
-        except (ValueError, IndexError):
-            return float("inf")
+@lru_cache(maxsize=1024)
+def _relative_date_to_days(date_str: str) -> float:
+    # Review and post dates repeat heavily ("a year ago", "2 weeks ago"), so
+    # each distinct string is parsed once.
+    lowered = date_str.lower()
+    if "now" in lowered or "moment" in lowered:
+        return 0
 
-    if "day" in date_str:
-        return num
-    elif "week" in date_str:
-        return num * 7
-    elif "month" in date_str:
-        return num * 30
-    elif "year" in date_str:
-        return num * 365
-    elif "hour" in date_str:
-        return num / 24
+    match = RELATIVE_DATE_PATTERN.match(date_str)
+    if not match:
+        return float("inf")
 
-    return float("inf")
+    count, unit = match.groups()
+    return (int(count) if count else 1) * DAYS_PER_UNIT[unit.lower()]
 
 
 def count_customer_photos(user_reviews):
@@ -40,49 +45,10 @@ def count_customer_photos(user_reviews):
     if not user_reviews or "most_relevant" not in user_reviews:
         return 0
 
-    total_customer_photos = 0
-    for review in user_reviews["most_relevant"]:
-        # Each review can have a list of images. Add the count of that list.
-        total_customer_photos += len(review.get("images", []))
-
-    return total_customer_photos
-
-
-def _convert_relative_date_to_days(date_str: str) -> float:
-    """
-    Converts a relative date string (e.g., "a week ago") into an estimated
-    number of days. Returns infinity for unparseable strings.
-    """
-    if not isinstance(date_str, str):
-        return float("inf")
-
-    date_str = date_str.lower()
-    num = 0
-
-    if "now" in date_str or "moment" in date_str:
-        return 0
-
-    parts = date_str.split()
-    if not parts:
-        return float("inf")
-
-    if parts[0] in ["a", "an"]:
-        num = 1
-    else:
-        try:
-            num = int(parts[0])
-        except ValueError:
-            return float("inf")
-
-    if "day" in date_str:
-        return num
-    elif "week" in date_str:
-        return num * 7
-    elif "month" in date_str:
-        return num * 30
-    elif "year" in date_str:
-        return num * 365
-    elif "hour" in date_str:
-        return num / 24
-
-    return float("inf")
+    # Each review can have a list of images; reviews without one are skipped
+    # rather than counted through an empty default list.
+    return sum(
+        len(review["images"])
+        for review in user_reviews["most_relevant"]
+        if "images" in review
+    )
@@ -0,0 +1,48 @@
+import logging
+
+from arq.connections import RedisSettings
+
+from src.core.config import config
+from src.scrapers.browser_pool import close_browser
+from src.services.gbp_analyzer import GBPAnalyzer
+from src.services.http_client import close_http_client
+
+
+async def run_analysis(ctx: dict, job_id: str, **kwargs) -> None:
+    """
+    arq task that runs a full GBP analysis for a job created by the API.
+    """
+    await ctx["analyzer"].run_background_analysis(job_id=job_id, **kwargs)
+
+
+async def startup(ctx: dict) -> None:
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    ctx["analyzer"] = GBPAnalyzer(api_key=config.SERP_API_KEY)
+
+
+async def shutdown(ctx: dict) -> None:
+    await close_http_client()
+    await close_browser()
+
+
+def get_redis_settings() -> RedisSettings:
+    """
+    Returns the arq Redis settings built from REDIS_URL.
+    """
+    if config.REDIS_URL:
+        return RedisSettings.from_dsn(config.REDIS_URL)
+
+    return RedisSettings()
+
+
+class WorkerSettings:
+    """
+    Settings for the analysis worker. Run with:
+    `arq src.worker.WorkerSettings`
+    """
+
+    functions = [run_analysis]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = get_redis_settings()
+    job_timeout = 600
@@ -1,47 +1,71 @@
 import argparse
+import logging
+import sys
 from pprint import pprint
 from src.api.v1.routers.reviews import GmbAnalyzer
 from src.utils.computation import calculate_score
 from src.core.config import config
 
+# Repeated CLI runs re-issue the same SerpApi queries, so the CLI keeps its
+# response cache on disk unless CACHE_DB_PATH points somewhere else.
+DEFAULT_CACHE_DB_PATH = ".cache/gbp.sqlite3"
+
 
 def main():
     """
     Main function to run the GBP analysis script. Hanldes arguments and printing.
     """
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
     parser = argparse.ArgumentParser(
         description="A command-line tool to analyze Google Business Profile.",
         formatter_class=argparse.RawTextHelpFormatter,
     )
     parser.add_argument(
-        "query",
-        type=str,
-        help="The business search query. \nExample: 'Art Institute of Chicago' or 'Pilsen Yards, 60608'",  # noqa
+        "queries",
+        nargs="+",
+        metavar="query",
+        help="One or more business search queries, analyzed concurrently. \nExample: 'Art Institute of Chicago' or 'Pilsen Yards, 60608'",  # noqa
+    )
+
+    parser.add_argument(
+        "--cache-db",
+        default=config.CACHE_DB_PATH or DEFAULT_CACHE_DB_PATH,
+        help="SQLite file for cached SerpApi responses. Pass '' to keep the cache in memory.",  # noqa
     )
 
     analyzer = GmbAnalyzer(api_key=config.SERP_API_KEY)
 
     args = parser.parse_args()
+    config.CACHE_DB_PATH = args.cache_db or None
 
-    print(f"--- Analyzing GBP profile for: '{args.query}' ---\n")
+    print(f"--- Analyzing {len(args.queries)} GBP profile(s) ---\n")
 
-    result = analyzer.analyze(query=args.query)
+    # A failed query is reported in its result rather than raised, so the
+    # remaining queries in the batch still complete.
+    results = analyzer.analyze_many_sync(args.queries)
 
     print("--- Analysis Complete ---")
 
-    if result["success"]:
-        business_data = result["data"]
+    for result in results:
+        print(f"\n=== {result.query} ===")
+
+        if result.success:
+            business_data = result.data
+
+            print("\n--- Raw Data Analysis ---")
+            pprint(business_data)
 
-        print("\n--- Raw Data Analysis ---")
-        pprint(business_data)
+            score = calculate_score(business_data)
 
-        score = calculate_score(business_data)
+            print("\n--- Final Score ---")
+            print("Business Health Score: ", score)
+        else:
+            print("\n--- Analysis Failed ---")
+            print(f"Error: {result.error}")
 
-        print("\n--- Final Score ---")
-        print("Business Health Score: ", score)
-    else:
-        print("\n--- Analysis Failed ---")
-        print(f"Error: {result['error']}")
+    if not all(result.success for result in results):
+        sys.exit(1)
 
 
 if __name__ == "__main__":